@@ -4,12 +4,70 @@ Converts natural language to structured calendar events.
 """
 
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
 
+# The third-party `regex` package compiles to a faster matcher and is a
+# drop-in replacement for `re`; fall back to the stdlib engine if absent
+try:
+    import regex as _regex_engine
+except ImportError:
+    _regex_engine = re
+
+# Import MCP tools once at module load; per-method imports paid the
+# import-lock and sys.modules lookup on every call
+try:
+    from mcp.google_calendar_client import GoogleCalendarClient
+except ImportError:
+    GoogleCalendarClient = None
+
+try:
+    from mcp.database_tool import get_database_tool
+except ImportError:
+    get_database_tool = None
+
+# Action keyword sets for _detect_calendar_action (hashed membership
+# instead of one substring scan per keyword)
+_CREATE_WORDS = frozenset({'create', 'schedule', 'add', 'book'})
+_LIST_WORDS = frozenset({'list', 'show', 'view', 'what', 'upcoming'})
+_UPDATE_WORDS = frozenset({'update', 'change', 'modify', 'reschedule'})
+_DELETE_WORDS = frozenset({'delete', 'remove', 'cancel'})
+
+_TOKEN_RE = _regex_engine.compile(r'[a-z]+')
+
+# Shared pool so the remote calendar write and the local mirror write
+# can be issued together in _create_event
+_WRITE_POOL = ThreadPoolExecutor(max_workers=2)
+
+_WEEKDAY_IDX = {
+    day: i for i, day in enumerate(
+        ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+    )
+}
+
+# Title is everything before the first time/date keyword. Matched
+# against the lowercased input (case-sensitive engine is faster than
+# re.IGNORECASE case-folding); the title is sliced from the original
+# string by span to keep its casing.
+_TITLE_RE = _regex_engine.compile(
+    r'^(?:schedule|create|add|book)?\s*(?:a|an)?\s*([^:]+?)'
+    r'(?:\s+on|\s+at|\s+for|\s+tomorrow|\s+today|\s+next)'
+)
+
+# Combined event-detail pattern: a single pass extracts date, time,
+# duration and description instead of one scan per field
+_EVENT_DETAILS_RE = _regex_engine.compile(
+    r'(?P<rel>today|tomorrow|next week)'
+    r'|(?P<indays>in (?P<indays_n>\d+) days?)'
+    r'|(?P<dur>for\s+(?P<dur_n>\d+)\s*(?P<dur_unit>hour|hr|minute|min)s?)'
+    r'|(?P<time>(?:at\s+)?(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<period>[ap]m?)?)'
+    r'|(?P<desc>(?:about|regarding|for)\s+(?P<desc_text>.+)$)'
+)
+
 
 class CalendarAgent:
     """
@@ -20,12 +78,17 @@ class CalendarAgent:
     def __init__(self):
         """Initialize calendar agent with MCP client."""
         try:
-            from mcp.google_calendar_client import GoogleCalendarClient
-            self.calendar_client = GoogleCalendarClient()
+            self.calendar_client = GoogleCalendarClient() if GoogleCalendarClient else None
             logger.info("Calendar agent initialized with MCP client")
         except Exception as e:
             logger.error(f"Failed to initialize calendar client: {e}")
             self.calendar_client = None
+
+        try:
+            self.db = get_database_tool() if get_database_tool else None
+        except Exception as e:
+            logger.error(f"Failed to initialize database tool: {e}")
+            self.db = None
     
     def process_calendar_request(
         self,
@@ -67,16 +130,19 @@ class CalendarAgent:
     def _detect_calendar_action(self, user_input: str) -> str:
         """Detect the type of calendar action requested."""
         user_input_lower = user_input.lower()
-        
-        if any(word in user_input_lower for word in ['create', 'schedule', 'add', 'book', 'set up']):
+
+        # Tokenize once; set intersection replaces 17 substring scans
+        tokens = set(_TOKEN_RE.findall(user_input_lower))
+
+        if not tokens.isdisjoint(_CREATE_WORDS) or 'set up' in user_input_lower:
             return 'create'
-        elif any(word in user_input_lower for word in ['list', 'show', 'view', 'what', 'upcoming']):
+        elif not tokens.isdisjoint(_LIST_WORDS):
             return 'list'
-        elif any(word in user_input_lower for word in ['update', 'change', 'modify', 'reschedule']):
+        elif not tokens.isdisjoint(_UPDATE_WORDS):
             return 'update'
-        elif any(word in user_input_lower for word in ['delete', 'remove', 'cancel']):
+        elif not tokens.isdisjoint(_DELETE_WORDS):
             return 'delete'
-        
+
         return 'create'  # Default to create
     
     def _create_event(self, user_input: str, context: Optional[Dict]) -> Dict[str, Any]:
@@ -95,16 +161,16 @@ class CalendarAgent:
                     'message': 'Could not extract event title. Please specify what you want to schedule.'
                 }
             
-            # Create event via MCP
+            # Create event via MCP; the local mirror write runs in
+            # parallel so latency is max(calendar, db) instead of the sum
             if self.calendar_client:
-                result = self.calendar_client.create_event(event_details)
-                
+                calendar_future = _WRITE_POOL.submit(self.calendar_client.create_event, event_details)
+                save_future = _WRITE_POOL.submit(self.db.save_event, event_details)
+
+                result = calendar_future.result()
+                save_future.result()
+
                 if result.get('success'):
-                    # Also save to local database
-                    from mcp.database_tool import DatabaseTool
-                    db = DatabaseTool()
-                    db.save_event(event_details)
-                    
                     return {
                         'success': True,
                         'message': f"✅ Created event: {event_details['title']} on {event_details['date']} at {event_details.get('time', 'all day')}",
@@ -115,9 +181,7 @@ class CalendarAgent:
                     return result
             else:
                 # Fallback to local storage only
-                from mcp.database_tool import DatabaseTool
-                db = DatabaseTool()
-                event_id = db.save_event(event_details)
+                event_id = self.db.save_event(event_details)
                 
                 return {
                     'success': True,
@@ -139,58 +203,72 @@ class CalendarAgent:
             Dictionary with: title, date, time, duration, description
         """
         details = {}
-        
+        text_lower = user_input.lower()
+
         # Extract title (everything before time/date keywords)
-        title_match = re.match(r'^(?:schedule|create|add|book)?\s*(?:a|an)?\s*([^:]+?)(?:\s+on|\s+at|\s+for|\s+tomorrow|\s+today|\s+next)', user_input, re.IGNORECASE)
+        title_match = _TITLE_RE.match(text_lower)
         if title_match:
-            details['title'] = title_match.group(1).strip()
+            start, end = title_match.span(1)
+            details['title'] = user_input[start:end].strip()
         else:
             # Fallback: take first 5 words
             words = user_input.split()[:5]
             details['title'] = ' '.join(words)
-        
+
+        # Single sweep collecting the first match per field
+        found = {}
+        for match in _EVENT_DETAILS_RE.finditer(text_lower):
+            for key in ('rel', 'indays', 'dur', 'time', 'desc'):
+                if key not in found and match.group(key) is not None:
+                    found[key] = match
+                    break
+
         # Extract date
-        date_info = self._extract_date(user_input)
+        date_info = self._extract_date(found, text_lower)
         details['date'] = date_info['date']
         details['date_str'] = date_info['date_str']
-        
+
         # Extract time
-        time_info = self._extract_time(user_input)
+        time_info = self._extract_time(found.get('time'))
         details['time'] = time_info['time']
         details['time_str'] = time_info['time_str']
-        
+
         # Extract duration
-        duration = self._extract_duration(user_input)
-        details['duration'] = duration
-        
-        # Description (optional)
-        desc_match = re.search(r'(?:about|regarding|for)\s+(.+)$', user_input, re.IGNORECASE)
+        details['duration'] = self._extract_duration(found.get('dur'))
+
+        # Description (optional) - slice from the original input to keep casing
+        desc_match = found.get('desc')
         if desc_match:
-            details['description'] = desc_match.group(1).strip()
+            start, end = desc_match.span('desc_text')
+            details['description'] = user_input[start:end].strip()
         else:
             details['description'] = ''
-        
+
         return details
     
-    def _extract_date(self, text: str) -> Dict[str, str]:
-        """Extract date from natural language."""
+    def _extract_date(self, found: Dict[str, Any], text_lower: str) -> Dict[str, str]:
+        """Resolve the event date from the combined-sweep matches."""
         today = datetime.now()
-        text_lower = text.lower()
-        
+
+        rel_match = found.get('rel')
+        rel = rel_match.group('rel') if rel_match else None
+
         # Check for relative dates
-        if 'today' in text_lower:
+        if rel == 'today':
             target_date = today
-        elif 'tomorrow' in text_lower:
+        elif rel == 'tomorrow':
             target_date = today + timedelta(days=1)
-        elif 'next week' in text_lower:
+        elif rel == 'next week':
             target_date = today + timedelta(days=7)
-        elif match := re.search(r'in (\d+) days?', text_lower):
-            days = int(match.group(1))
+        elif match := found.get('indays'):
+            days = int(match.group('indays_n'))
             target_date = today + timedelta(days=days)
-        elif match := re.search(r'(monday|tuesday|wednesday|thursday|friday|saturday|sunday)', text_lower):
-            weekday_name = match.group(1)
-            weekdays = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-            target_weekday = weekdays.index(weekday_name)
+        elif (target_weekday := next(
+                # _TOKEN_RE strips adjacent punctuation ("Monday.") and
+                # rstrip('s') keeps plural forms ("Thursdays") matching,
+                # as the old substring scan did
+                (_WEEKDAY_IDX[t.rstrip('s')] for t in _TOKEN_RE.findall(text_lower)
+                 if t.rstrip('s') in _WEEKDAY_IDX), None)) is not None:
             current_weekday = today.weekday()
             days_ahead = (target_weekday - current_weekday) % 7
             if days_ahead == 0:
@@ -199,63 +277,58 @@ class CalendarAgent:
         else:
             # Default to today
             target_date = today
-        
+
         return {
             'date': target_date.strftime('%Y-%m-%d'),
             'date_str': target_date.strftime('%A, %B %d, %Y')
         }
-    
-    def _extract_time(self, text: str) -> Dict[str, str]:
-        """Extract time from natural language."""
-        # Match patterns like "3pm", "3:30pm", "15:00", "at 2"
-        time_pattern = r'(?:at\s+)?(\d{1,2})(?::(\d{2}))?\s*([ap]m?)?'
-        match = re.search(time_pattern, text.lower())
-        
+
+    def _extract_time(self, match: Optional[Any]) -> Dict[str, str]:
+        """Convert the matched time (e.g. "3pm", "3:30pm", "at 2") to 24-hour format."""
         if match:
-            hour = int(match.group(1))
-            minute = int(match.group(2)) if match.group(2) else 0
-            period = match.group(3)
-            
+            hour = int(match.group('hour'))
+            minute = int(match.group('minute')) if match.group('minute') else 0
+            period = match.group('period')
+
             # Convert to 24-hour format
             if period and 'p' in period and hour != 12:
                 hour += 12
             elif period and 'a' in period and hour == 12:
                 hour = 0
-            
-            time_obj = datetime.strptime(f"{hour:02d}:{minute:02d}", '%H:%M')
-            return {
-                'time': time_obj.strftime('%H:%M'),
-                'time_str': time_obj.strftime('%I:%M %p')
-            }
-        
+
+            # Format directly instead of round-tripping through
+            # strptime/strftime; treat out-of-range values as all day
+            if hour <= 23 and minute <= 59:
+                hour12 = hour % 12 or 12
+                return {
+                    'time': f"{hour:02d}:{minute:02d}",
+                    'time_str': f"{hour12:02d}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+                }
+
         return {
             'time': None,
             'time_str': 'All day'
         }
-    
-    def _extract_duration(self, text: str) -> str:
-        """Extract duration from natural language."""
-        # Match patterns like "for 2 hours", "1 hour", "30 minutes"
-        duration_pattern = r'for\s+(\d+)\s*(hour|hr|minute|min)s?'
-        match = re.search(duration_pattern, text.lower())
+
+    def _extract_duration(self, match: Optional[Any]) -> str:
+        """Build the duration string (e.g. "2 hours", "30 minutes") from its match."""
         if match:
-            amount = int(match.group(1))
-            unit = match.group(2)
-            
+            amount = int(match.group('dur_n'))
+            unit = match.group('dur_unit')
+
             if 'hour' in unit or 'hr' in unit:
                 return f"{amount} hour{'s' if amount > 1 else ''}"
             else:
                 return f"{amount} minute{'s' if amount > 1 else ''}"
-        
+
         # Default duration
         return "1 hour"
 
     def _list_events(self, user_input: str, context: Optional[Dict]) -> Dict[str, Any]:
         """List calendar events."""
         try:
-            from mcp.database_tool import DatabaseTool
-            db = DatabaseTool()
-            
+            db = self.db
+
             # Determine time range
             if 'today' in user_input.lower():
                 events = db.get_events_for_date(datetime.now().strftime('%Y-%m-%d'))
@@ -286,9 +359,8 @@ class CalendarAgent:
     def _update_event(self, user_input: str, context: Optional[Dict]) -> Dict[str, Any]:
         """Update an existing calendar event."""
         try:
-            from mcp.database_tool import DatabaseTool
-            db = DatabaseTool()
-            
+            db = self.db
+
             # Extract event identifier and new details
             # This is simplified - in production, you'd have a more sophisticated parser
             event_id = context.get('event_id') if context else None
@@ -324,9 +396,8 @@ class CalendarAgent:
     def _delete_event(self, user_input: str, context: Optional[Dict]) -> Dict[str, Any]:
         """Delete a calendar event."""
         try:
-            from mcp.database_tool import DatabaseTool
-            db = DatabaseTool()
-            
+            db = self.db
+
             event_id = context.get('event_id') if context else None
             
             if not event_id:
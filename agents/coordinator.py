@@ -3,11 +3,24 @@ Coordinator Agent - Entry point for all user requests.
 Routes requests to appropriate specialized agents based on intent detection.
 """
 
+import queue
 import re
+import threading
 from typing import Dict, Any, Optional
 from datetime import datetime
 import logging
 
+# Optional Aho-Corasick backend for single-pass keyword scanning
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    from mcp.database_tool import get_database_tool
+except ImportError:
+    get_database_tool = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,7 +36,15 @@ class CoordinatorAgent:
         """Initialize coordinator with agent registry."""
         self.agents = {}
         self._initialize_agents()
-        
+
+        # Intent dispatch table; dict lookup replaces the if/elif chain
+        self._dispatch = {
+            'calendar': self._handle_calendar,
+            'summarize': self._handle_summarize,
+            'plan': self._handle_plan,
+            'evaluate': self._handle_evaluate,
+        }
+
         # Intent patterns for routing
         self.intent_patterns = {
             'calendar': [
@@ -43,7 +64,52 @@ class CoordinatorAgent:
                 r'metrics', r'score'
             ]
         }
-    
+
+        self._build_keyword_matcher()
+
+        # Intent detection is pure, so repeated inputs (UI buttons,
+        # retries) can skip the scan entirely
+        self._intent_cache = {}
+
+        # Interaction logging is fire-and-forget; a daemon worker drains
+        # the queue so the DB write stays off the request path
+        self._log_queue = queue.Queue(maxsize=1024)
+        threading.Thread(target=self._log_worker, daemon=True).start()
+
+    def _build_keyword_matcher(self):
+        """
+        Build a single-pass keyword matcher from the intent patterns.
+
+        Most patterns are plain literals, so they can all be scanned in one
+        pass with an Aho-Corasick automaton (or a per-intent alternation as
+        fallback) instead of one re.search per keyword. The few wildcard
+        patterns (e.g. 'plan.*time') are kept as a small residual regex list.
+        """
+        literal_keywords = []
+        self._wildcard_patterns = []
+
+        for intent, patterns in self.intent_patterns.items():
+            for pattern in patterns:
+                if re.escape(pattern) == pattern:
+                    literal_keywords.append((pattern, intent))
+                else:
+                    self._wildcard_patterns.append((intent, re.compile(pattern)))
+
+        if ahocorasick is not None:
+            self._keyword_automaton = ahocorasick.Automaton()
+            for keyword, intent in literal_keywords:
+                self._keyword_automaton.add_word(keyword, intent)
+            self._keyword_automaton.make_automaton()
+            self._keyword_regexes = None
+        else:
+            # Fallback: one alternation scan per intent instead of one per keyword
+            self._keyword_automaton = None
+            self._keyword_regexes = {}
+            for intent in self.intent_patterns:
+                keywords = [kw for kw, kw_intent in literal_keywords if kw_intent == intent]
+                if keywords:
+                    self._keyword_regexes[intent] = re.compile('|'.join(map(re.escape, keywords)))
+
     def _initialize_agents(self):
         """Lazy load agents to avoid circular imports."""
         try:
@@ -71,22 +137,50 @@ class CoordinatorAgent:
         Returns:
             Intent category: 'calendar', 'summarize', 'plan', 'evaluate', or 'general'
         """
+        cached_intent = self._intent_cache.get(user_input)
+        if cached_intent is not None:
+            return cached_intent
+
         user_input_lower = user_input.lower()
-        
-        # Score each intent
-        intent_scores = {}
-        for intent, patterns in self.intent_patterns.items():
-            score = sum(1 for pattern in patterns if re.search(pattern, user_input_lower))
-            intent_scores[intent] = score
-        
-        # Return highest scoring intent
-        if max(intent_scores.values()) > 0:
-            detected_intent = max(intent_scores, key=intent_scores.get)
+
+        # Score each intent with a single pass over the input, tracking
+        # the winner inline instead of re-scanning the score dict
+        intent_scores = dict.fromkeys(self.intent_patterns, 0)
+        best_intent, best_score = 'general', 0
+
+        if self._keyword_automaton is not None:
+            for _, intent in self._keyword_automaton.iter(user_input_lower):
+                score = intent_scores[intent] + 1
+                intent_scores[intent] = score
+                if score > best_score:
+                    best_score, best_intent = score, intent
+        else:
+            for intent, keyword_regex in self._keyword_regexes.items():
+                score = intent_scores[intent] + len(keyword_regex.findall(user_input_lower))
+                intent_scores[intent] = score
+                if score > best_score:
+                    best_score, best_intent = score, intent
+
+        # Residual wildcard patterns still need a regex scan
+        for intent, pattern in self._wildcard_patterns:
+            if pattern.search(user_input_lower):
+                score = intent_scores[intent] + 1
+                intent_scores[intent] = score
+                if score > best_score:
+                    best_score, best_intent = score, intent
+
+        detected_intent = best_intent
+        if best_score > 0:
             logger.info(f"Detected intent: {detected_intent} for input: {user_input[:50]}...")
-            return detected_intent
-        
-        logger.info(f"No specific intent detected for: {user_input[:50]}...")
-        return 'general'
+        else:
+            logger.info(f"No specific intent detected for: {user_input[:50]}...")
+
+        # Bounded FIFO cache
+        if len(self._intent_cache) >= 2048:
+            self._intent_cache.pop(next(iter(self._intent_cache)))
+        self._intent_cache[user_input] = detected_intent
+
+        return detected_intent
     
     def handle_request(
         self,
@@ -106,30 +200,25 @@ class CoordinatorAgent:
             Response dictionary with results and metadata
         """
         try:
+            # One timestamp per request, shared with the interaction log
+            timestamp = datetime.now().isoformat()
+
             # Detect or use provided intent
             intent = intent_override if intent_override else self.detect_intent(user_input)
             
             logger.info(f"Processing request with intent: {intent}")
             
             # Route to appropriate agent
-            if intent == 'calendar':
-                response = self._handle_calendar(user_input, context)
-            elif intent == 'summarize':
-                response = self._handle_summarize(user_input, context)
-            elif intent == 'plan':
-                response = self._handle_plan(user_input, context)
-            elif intent == 'evaluate':
-                response = self._handle_evaluate(user_input, context)
-            else:
-                response = self._handle_general(user_input)
+            handler = self._dispatch.get(intent, self._handle_general)
+            response = handler(user_input, context)
             
             # Add metadata
             response['intent'] = intent
-            response['timestamp'] = datetime.now().isoformat()
+            response['timestamp'] = timestamp
             response['input'] = user_input
-            
+
             # Log interaction
-            self._log_interaction(user_input, intent, response)
+            self._log_interaction(user_input, intent, response, timestamp)
             
             return response
             
@@ -193,7 +282,7 @@ class CoordinatorAgent:
             logger.error(f"Evaluator agent error: {e}")
             return {'success': False, 'message': f'Evaluator error: {str(e)}'}
     
-    def _handle_general(self, user_input: str) -> Dict[str, Any]:
+    def _handle_general(self, user_input: str, context: Optional[Dict] = None) -> Dict[str, Any]:
         """Handle general queries without specific agent."""
         return {
             'success': True,
@@ -206,23 +295,43 @@ class CoordinatorAgent:
             ]
         }
     
-    def _log_interaction(self, user_input: str, intent: str, response: Dict[str, Any]):
-        """Log interaction for evaluation and debugging."""
+    def _log_interaction(self, user_input: str, intent: str, response: Dict[str, Any], timestamp: str):
+        """Queue interaction for background logging."""
+        log_entry = {
+            'timestamp': timestamp,
+            'input': user_input[:200],  # Truncate for storage
+            'intent': intent,
+            'success': response.get('success', False),
+            'action': response.get('message', '')[:200]
+        }
+
         try:
-            from mcp.database_tool import DatabaseTool
-            db = DatabaseTool()
-            
-            log_entry = {
-                'timestamp': datetime.now().isoformat(),
-                'input': user_input[:200],  # Truncate for storage
-                'intent': intent,
-                'success': response.get('success', False),
-                'action': response.get('message', '')[:200]
-            }
-            
-            db.log_interaction(log_entry)
-        except Exception as e:
-            logger.warning(f"Failed to log interaction: {e}")
+            self._log_queue.put_nowait(log_entry)
+        except queue.Full:
+            logger.warning("Interaction log queue full, dropping entry")
+
+    def _log_worker(self):
+        """Drain queued interaction logs to the database.
+
+        Entries that piled up while a write was in flight are flushed
+        together through the bulk API, one commit per batch instead of
+        one per entry.
+        """
+        while True:
+            batch = [self._log_queue.get()]
+            while len(batch) < 64:
+                try:
+                    batch.append(self._log_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                db = get_database_tool()
+                db.log_interactions_bulk(batch)
+            except Exception as e:
+                logger.warning(f"Failed to log interactions: {e}")
+            finally:
+                for _ in batch:
+                    self._log_queue.task_done()
     
     def get_agent_status(self) -> Dict[str, bool]:
         """Check status of all agents."""
@@ -4,12 +4,58 @@ Evaluates summaries, flashcards, and model performance.
 """
 
 import logging
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Any, Optional, List
 from datetime import datetime
-import json
+
+try:
+    from mcp.database_tool import get_database_tool
+except ImportError:
+    get_database_tool = None
+
+# Optional NumPy backend for vectorized batch scoring
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Optional Numba JIT for the Jaccard kernel used in model comparison
+try:
+    import numba
+except ImportError:
+    numba = None
 
 logger = logging.getLogger(__name__)
 
+# Word tokenizer for similarity scoring; strips punctuation so 'word.'
+# and 'word' count as the same token
+_WORD_RE = re.compile(r'\w+')
+
+if numba is not None and np is not None:
+    @numba.njit(cache=True)
+    def _jaccard_sorted(ids1, ids2):  # pragma: no cover - compiled path
+        """Jaccard similarity of two sorted, deduplicated id arrays."""
+        i = j = intersection = 0
+        while i < len(ids1) and j < len(ids2):
+            if ids1[i] == ids2[j]:
+                intersection += 1
+                i += 1
+                j += 1
+            elif ids1[i] < ids2[j]:
+                i += 1
+            else:
+                j += 1
+        union = len(ids1) + len(ids2) - intersection
+        return intersection / union if union else 0.0
+else:
+    _jaccard_sorted = None
+
+_INTERROGATIVES = ('what', 'how', 'why', 'when', 'where', 'who', 'which')
+
+# Vectorizing pays off once the batch is past trivial size
+_VECTORIZE_MIN_CARDS = 8
+
 
 class EvaluatorAgent:
     """
@@ -20,7 +66,31 @@ class EvaluatorAgent:
     def __init__(self):
         """Initialize evaluator with metrics tracking."""
         self.metrics_history = []
+        self._db = None
+        self._warm_up()
         logger.info("Evaluator agent initialized")
+
+    def _warm_up(self):
+        """
+        Exercise the optional accelerators once at construction so the
+        first real request does not pay JIT compilation or NumPy setup.
+        """
+        try:
+            if _jaccard_sorted is not None:
+                _jaccard_sorted(np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64))
+            if np is not None:
+                self._calculate_flashcard_metrics_vectorized(
+                    [{'question': 'What is warmup?', 'answer': 'A dry run.'}] * 2
+                )
+        except Exception as e:
+            logger.warning(f"Evaluator warm-up failed: {e}")
+
+    @property
+    def db(self):
+        """Shared database handle, created on first use."""
+        if self._db is None:
+            self._db = get_database_tool()
+        return self._db
     
     def evaluate_output(
         self,
@@ -56,7 +126,33 @@ class EvaluatorAgent:
         except Exception as e:
             logger.error(f"Error during evaluation: {e}")
             return {'success': False, 'message': f'Evaluation error: {str(e)}'}
-    
+
+    def evaluate_all(self) -> Dict[str, Any]:
+        """
+        Run flashcard, summary and overall evaluations concurrently.
+
+        The three branches are independent and I/O-bound on the database,
+        so fanning them out over a small thread pool brings the combined
+        report's wall time from the sum of the branches to the slowest one.
+
+        Returns:
+            Dictionary keyed by evaluation type with each branch's result
+        """
+        # One snapshot round-trip feeds all three branches
+        snapshot = self.db.get_evaluation_snapshot()
+        results: Dict[str, Any] = {}
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = {
+                pool.submit(self._evaluate_flashcards, None, snapshot): 'flashcards',
+                pool.submit(self._evaluate_summary, None, snapshot): 'summary',
+                pool.submit(self._evaluate_overall_performance, snapshot): 'overall',
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+        return results
+
     def _detect_evaluation_type(self, user_input: str, context: Optional[Dict]) -> str:
         """Detect type of evaluation requested."""
         if context and 'eval_type' in context:
@@ -71,10 +167,10 @@ class EvaluatorAgent:
         else:
             return 'overall'
     
-    def _evaluate_flashcards(self, context: Optional[Dict]) -> Dict[str, Any]:
+    def _evaluate_flashcards(self, context: Optional[Dict], snapshot: Optional[Dict] = None) -> Dict[str, Any]:
         """
         Evaluate flashcard quality.
-        
+
         Metrics:
         - Clarity: Question clarity score
         - Completeness: Answer completeness
@@ -82,11 +178,24 @@ class EvaluatorAgent:
         - Relevance: Topic relevance
         """
         try:
-            from mcp.database_tool import DatabaseTool
-            db = DatabaseTool()
-            
-            # Get recent flashcards
-            flashcards = db.get_recent_flashcards(limit=50)
+            if snapshot is not None:
+                flashcards = snapshot['flashcards']
+            else:
+                # For decks beyond the sampling window, let SQLite compute
+                # the aggregates server-side instead of shipping rows over
+                if self.db.count_flashcards() > 50:
+                    aggregates = self.db.get_flashcard_metric_aggregates()
+                    if aggregates.get('count'):
+                        num_evaluated = aggregates.pop('count')
+                        self._save_evaluation('flashcards', aggregates)
+                        return {
+                            'success': True,
+                            'message': f'Evaluated {num_evaluated} flashcards',
+                            'metrics': aggregates,
+                            'num_evaluated': num_evaluated
+                        }
+
+                flashcards = self.db.get_recent_flashcards(limit=50)
             
             if not flashcards:
                 return {
@@ -116,89 +225,127 @@ class EvaluatorAgent:
         """Calculate comprehensive flashcard metrics."""
         if not flashcards:
             return {}
-        
-        clarity_scores = []
-        completeness_scores = []
-        difficulty_scores = []
-        
+
+        if np is not None and len(flashcards) >= _VECTORIZE_MIN_CARDS:
+            return self._calculate_flashcard_metrics_vectorized(flashcards)
+
+        # Fused single pass: running sums instead of three score lists
+        clarity_sum = completeness_sum = difficulty_sum = 0.0
+
         for card in flashcards:
-            # Clarity: Based on question structure
-            clarity = self._score_clarity(card.get('question', ''))
-            clarity_scores.append(clarity)
-            
-            # Completeness: Based on answer length and structure
-            completeness = self._score_completeness(card.get('answer', ''))
-            completeness_scores.append(completeness)
-            
-            # Difficulty: Based on complexity
-            difficulty = self._estimate_difficulty(card.get('question', ''), card.get('answer', ''))
-            difficulty_scores.append(difficulty)
-        
+            # Derive each string feature once per card; the three scorers
+            # share them instead of re-lowering/re-splitting
+            question = card.get('question', '')
+            answer = card.get('answer', '')
+            q_lower = question.lower()
+            q_stripped = question.strip()
+            q_word_count = len(question.split())
+            a_stripped = answer.strip()
+            a_word_count = len(answer.split())
+
+            clarity_sum += self._score_clarity(q_lower, q_stripped, q_word_count)
+            completeness_sum += self._score_completeness(a_stripped, a_word_count)
+            difficulty_sum += self._estimate_difficulty(q_lower, a_word_count)
+
+        n = len(flashcards)
         return {
-            'clarity': sum(clarity_scores) / len(clarity_scores),
-            'completeness': sum(completeness_scores) / len(completeness_scores),
-            'difficulty': sum(difficulty_scores) / len(difficulty_scores),
-            'overall_quality': (sum(clarity_scores) + sum(completeness_scores)) / (2 * len(clarity_scores))
+            'clarity': clarity_sum / n,
+            'completeness': completeness_sum / n,
+            'difficulty': difficulty_sum / n,
+            'overall_quality': (clarity_sum + completeness_sum) / (2 * n)
         }
-    
-    def _score_clarity(self, question: str) -> float:
-        """Score question clarity (0-1)."""
-        score = 0.5  # Base score
-        
-        # Question starts with interrogative word
-        interrogatives = ['what', 'how', 'why', 'when', 'where', 'who', 'which']
-        if any(question.lower().startswith(word) for word in interrogatives):
-            score += 0.2
-        
-        # Ends with question mark
-        if question.strip().endswith('?'):
-            score += 0.1
-        
-        # Appropriate length (not too short or long)
-        word_count = len(question.split())
-        if 4 <= word_count <= 20:
-            score += 0.2
-        elif word_count > 20:
-            score -= 0.1
-        
+
+    def _calculate_flashcard_metrics_vectorized(self, flashcards: List[Dict]) -> Dict[str, float]:
+        """
+        NumPy batch variant of _calculate_flashcard_metrics.
+
+        Extracts per-card features (word counts, interrogative start,
+        punctuation) in one pass, then evaluates the same scoring rules as
+        the scalar helpers with boolean array arithmetic instead of
+        per-card branching.
+        """
+        questions = [card.get('question', '') for card in flashcards]
+        answers = [card.get('answer', '') for card in flashcards]
+        q_lowers = [q.lower() for q in questions]
+        q_strips = [q.strip() for q in questions]
+        a_strips = [a.strip() for a in answers]
+
+        q_words = np.array([len(q.split()) for q in questions], dtype=np.float64)
+        a_words = np.array([len(a.split()) for a in answers], dtype=np.float64)
+        interrogative = np.array([q.startswith(_INTERROGATIVES) for q in q_lowers])
+        question_mark = np.array([q.endswith('?') for q in q_strips])
+        answer_punctuated = np.array([bool(a) and a[-1] in '.!' for a in a_strips])
+        multi_part = np.array(['and' in q or 'or' in q for q in q_lowers])
+
+        clarity = np.clip(
+            0.5
+            + 0.2 * interrogative
+            + 0.1 * question_mark
+            + 0.2 * ((q_words >= 4) & (q_words <= 20))
+            - 0.1 * (q_words > 20),
+            0, 1.0
+        )
+        completeness = np.clip(
+            0.5
+            + 0.3 * ((a_words >= 5) & (a_words <= 50))
+            + 0.2 * ((a_words > 50) & (a_words <= 100))
+            + 0.2 * answer_punctuated,
+            0, 1.0
+        )
+        difficulty = np.minimum(np.minimum(a_words / 50, 1.0) + 0.2 * multi_part, 1.0)
+
+        return {
+            'clarity': float(clarity.mean()),
+            'completeness': float(completeness.mean()),
+            'difficulty': float(difficulty.mean()),
+            'overall_quality': float((clarity.sum() + completeness.sum()) / (2 * len(flashcards)))
+        }
+
+    def _score_clarity(self, q_lower: str, q_stripped: str, word_count: int) -> float:
+        """Score question clarity (0-1) from precomputed question features."""
+        # Branchless form: each signal is a bool weighted into the score,
+        # mirroring the masked-add expression in the vectorized path
+        score = (
+            0.5
+            + 0.2 * q_lower.startswith(_INTERROGATIVES)
+            + 0.1 * q_stripped.endswith('?')
+            + 0.2 * (4 <= word_count <= 20)
+            - 0.1 * (word_count > 20)
+        )
+
         return min(max(score, 0), 1.0)
-    
-    def _score_completeness(self, answer: str) -> float:
-        """Score answer completeness (0-1)."""
+
+    def _score_completeness(self, a_stripped: str, word_count: int) -> float:
+        """Score answer completeness (0-1) from precomputed answer features."""
         score = 0.5  # Base score
-        
+
         # Appropriate length
-        word_count = len(answer.split())
         if 5 <= word_count <= 50:
             score += 0.3
         elif 50 < word_count <= 100:
             score += 0.2
-        
+
         # Has proper ending punctuation
-        if answer.strip() and answer.strip()[-1] in '.!':
+        if a_stripped and a_stripped[-1] in '.!':
             score += 0.2
-        
+
         return min(max(score, 0), 1.0)
-    
-    def _estimate_difficulty(self, question: str, answer: str) -> float:
+
+    def _estimate_difficulty(self, q_lower: str, a_word_count: int) -> float:
         """Estimate difficulty level (0-1, where 1 is most difficult)."""
-        # Simple heuristic based on length and complexity
-        q_words = len(question.split())
-        a_words = len(answer.split())
-        
         # Longer answers typically indicate more complex topics
-        complexity = min(a_words / 50, 1.0)
-        
+        complexity = min(a_word_count / 50, 1.0)
+
         # Multi-part questions are harder
-        if 'and' in question.lower() or 'or' in question.lower():
+        if 'and' in q_lower or 'or' in q_lower:
             complexity += 0.2
-        
+
         return min(complexity, 1.0)
     
-    def _evaluate_summary(self, context: Optional[Dict]) -> Dict[str, Any]:
+    def _evaluate_summary(self, context: Optional[Dict], snapshot: Optional[Dict] = None) -> Dict[str, Any]:
         """
         Evaluate summary quality.
-        
+
         Metrics:
         - Compression ratio
         - Key information retention
@@ -206,10 +353,10 @@ class EvaluatorAgent:
         - Readability
         """
         try:
-            from mcp.database_tool import DatabaseTool
-            db = DatabaseTool()
-            
-            summaries = db.get_recent_summaries(limit=20)
+            if snapshot is not None:
+                summaries = snapshot['summaries']
+            else:
+                summaries = self.db.get_recent_summaries(limit=20)
             
             if not summaries:
                 return {
@@ -283,19 +430,19 @@ class EvaluatorAgent:
         
         return min(score, 1.0)
     
-    def _evaluate_overall_performance(self) -> Dict[str, Any]:
+    def _evaluate_overall_performance(self, snapshot: Optional[Dict] = None) -> Dict[str, Any]:
         """
         Generate overall performance report.
-        
+
         Aggregates metrics across all evaluations.
         """
         try:
-            from mcp.database_tool import DatabaseTool
-            db = DatabaseTool()
-            
-            # Get aggregated metrics
-            metrics = db.get_evaluation_metrics()
-            logs = db.get_evaluation_logs(limit=100)
+            if snapshot is not None:
+                metrics = snapshot['metrics']
+                logs = snapshot['logs']
+            else:
+                metrics = self.db.get_evaluation_metrics()
+                logs = self.db.get_evaluation_logs(limit=100)
             
             # Calculate trends
             trends = self._calculate_trends(logs)
@@ -317,13 +464,25 @@ class EvaluatorAgent:
         if len(logs) < 2:
             return {'trend': 'insufficient_data'}
         
-        # Simple trend analysis: compare recent vs older scores
-        recent = logs[:len(logs)//2]
-        older = logs[len(logs)//2:]
-        
-        recent_avg = sum(log.get('score', 0) for log in recent) / len(recent) if recent else 0
-        older_avg = sum(log.get('score', 0) for log in older) / len(older) if older else 0
-        
+        # Simple trend analysis: compare recent vs older scores with one
+        # pass over the logs instead of materializing two half slices
+        n = len(logs)
+        mid = n // 2
+
+        if np is not None:
+            scores = np.fromiter((log.get('score', 0) for log in logs), dtype=np.float64, count=n)
+            recent_avg = float(scores[:mid].mean()) if mid else 0
+            older_avg = float(scores[mid:].mean())
+        else:
+            recent_sum = older_sum = 0.0
+            for i, log in enumerate(logs):
+                if i < mid:
+                    recent_sum += log.get('score', 0)
+                else:
+                    older_sum += log.get('score', 0)
+            recent_avg = recent_sum / mid if mid else 0
+            older_avg = older_sum / (n - mid)
+
         if recent_avg > older_avg * 1.1:
             trend = 'improving'
         elif recent_avg < older_avg * 0.9:
@@ -340,16 +499,13 @@ class EvaluatorAgent:
     def _save_evaluation(self, eval_type: str, metrics: Dict[str, float]):
         """Save evaluation results to database."""
         try:
-            from mcp.database_tool import DatabaseTool
-            db = DatabaseTool()
-            
             eval_data = {
                 'type': eval_type,
                 'metrics': metrics,
                 'timestamp': datetime.now().isoformat()
             }
-            
-            db.save_evaluation(eval_data)
+
+            self.db.save_evaluation(eval_data)
             logger.info(f"Saved {eval_type} evaluation")
             
         except Exception as e:
@@ -387,15 +543,22 @@ class EvaluatorAgent:
     def _calculate_similarity(self, text1: str, text2: str) -> float:
         """
         Calculate similarity between two texts.
-        Simple implementation using word overlap.
+        Jaccard index over word sets; uses the Numba merge kernel on
+        hashed token ids when available.
         """
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
-        
+        words1 = frozenset(_WORD_RE.findall(text1.lower()))
+        words2 = frozenset(_WORD_RE.findall(text2.lower()))
+
         if not words1 or not words2:
             return 0.0
-        
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        return len(intersection) / len(union) if union else 0.0
\ No newline at end of file
+
+        if _jaccard_sorted is not None:
+            ids1 = np.sort(np.fromiter((hash(w) for w in words1), dtype=np.int64, count=len(words1)))
+            ids2 = np.sort(np.fromiter((hash(w) for w in words2), dtype=np.int64, count=len(words2)))
+            return float(_jaccard_sorted(ids1, ids2))
+
+        # One intersection; the union size follows by inclusion-exclusion
+        intersection = len(words1 & words2)
+        union = len(words1) + len(words2) - intersection
+
+        return intersection / union if union else 0.0
\ No newline at end of file
@@ -4,13 +4,124 @@ Creates personalized study plans based on deadlines, topics, and user preference
 """
 
 import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+from functools import lru_cache
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 import json
 
+# Optional Aho-Corasick backend for single-pass subject scanning
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    from mcp.database_tool import get_database_tool
+except ImportError:
+    get_database_tool = None
+
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def _get_calendar_agent():
+    """Shared CalendarAgent, imported lazily to avoid circular imports."""
+    from agents.calendar_agent import CalendarAgent
+    return CalendarAgent()
+
+
+class SessionType(IntEnum):
+    """Session categories, stored as ints for cheap filtering."""
+    FOCUSED_STUDY = 1
+    REVIEW = 2
+    BREAK = 3
+
+
+# Sessions that count as study time; membership is one shift + AND
+# instead of a per-check string list
+_STUDY_MASK = (1 << SessionType.FOCUSED_STUDY) | (1 << SessionType.REVIEW)
+
+_SESSION_TYPE_NAMES = {session_type: session_type.name.lower() for session_type in SessionType}
+
+
+def _session_type_name(session_type: int) -> str:
+    """Human-readable name for a stored session_type value."""
+    return _SESSION_TYPE_NAMES.get(session_type, str(session_type))
+
+
+# Common academic subjects recognized by _extract_topics
+_COMMON_SUBJECTS = (
+    'math', 'calculus', 'algebra', 'geometry', 'statistics',
+    'physics', 'chemistry', 'biology', 'anatomy',
+    'history', 'geography', 'literature', 'english',
+    'computer science', 'programming', 'algorithms',
+    'economics', 'psychology', 'sociology'
+)
+
+if ahocorasick is not None:
+    _SUBJECT_AUTOMATON = ahocorasick.Automaton()
+    for _subject in _COMMON_SUBJECTS:
+        _SUBJECT_AUTOMATON.add_word(_subject, _subject)
+    _SUBJECT_AUTOMATON.make_automaton()
+    _SUBJECT_RE = None
+else:
+    # Fallback: one alternation scan over all subjects (longest first so
+    # multi-word subjects like 'computer science' win) instead of one
+    # substring scan per subject
+    _SUBJECT_AUTOMATON = None
+    _SUBJECT_RE = re.compile(
+        '|'.join(sorted(_COMMON_SUBJECTS, key=len, reverse=True))
+    )
+
+# Weekday names indexed by datetime.weekday(); avoids a strftime('%A')
+# round-trip per scheduled day
+_WEEKDAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+_ONE_DAY = timedelta(days=1)
+
+
+@lru_cache(maxsize=32)
+def _day_session_shape(daily_hours: int):
+    """
+    Resolve the per-day session slots for a given daily hour budget.
+
+    The remaining-hours branches in _create_study_schedule depend only on
+    daily_hours, so they are evaluated once per distinct budget and
+    cached; the day loop then just instantiates the slot tuple.
+
+    Returns (study_slots, topic_advance, has_review) where study_slots is
+    a tuple of (time, topic_offset) pairs.
+    """
+    study_slots = []
+    remaining_hours = daily_hours
+
+    # Morning session (9 AM)
+    if remaining_hours >= 2:
+        study_slots.append(('09:00', 0))
+        remaining_hours -= 2
+
+    # Afternoon session (2 PM); having one advances the topic rotation
+    if remaining_hours >= 2:
+        study_slots.append(('14:00', 1))
+        remaining_hours -= 2
+
+    topic_advance = 1 if len(study_slots) == 2 else 0
+    has_review = remaining_hours >= 1
+
+    return tuple(study_slots), topic_advance, has_review
+
+
+# Parse patterns compiled once; request parsing is on the hot path
+_RE_HOURS = re.compile(r'(\d+)\s*hours?\s*(?:per\s*day|daily|each\s*day)')
+_RE_IN_N_DAYS = re.compile(r'in\s+(\d+)\s+days?')
+_RE_IN_N_WEEKS = re.compile(r'in\s+(\d+)\s+weeks?')
+_RE_QUOTED = re.compile(r'["\']([^"\']+)["\']')
+_RE_STUDY = re.compile(r'study\s+([a-zA-Z\s]{3,30})(?:\s+and|\s+for|\s+exam|$)')
+
+
 class PlannerAgent:
     """
     Handles study plan generation and optimization.
@@ -26,7 +137,13 @@ class PlannerAgent:
         self.default_session_duration = 60  # minutes
         self.default_break_duration = 15  # minutes
         self.max_daily_hours = 8  # Maximum study hours per day
-        
+
+        # Prime the parse patterns and the default day shape so the
+        # first request skips regex engine and cache warm-up
+        for pattern in (_RE_HOURS, _RE_IN_N_DAYS, _RE_IN_N_WEEKS, _RE_QUOTED, _RE_STUDY):
+            pattern.search('')
+        _day_session_shape(3)
+
         logger.info("Planner agent initialized")
     
     def generate_study_plan(
@@ -54,9 +171,9 @@ class PlannerAgent:
                     'message': 'Could not identify study topics. Please specify what you need to study.'
                 }
             
-            # Generate schedule
-            plan = self._create_study_schedule(study_info)
-            
+            # Generate schedule (metadata counters are collected inline)
+            plan, plan_metadata = self._create_study_schedule(study_info)
+
             # Optimize plan
             optimized_plan = self._optimize_schedule(plan, study_info)
             
@@ -71,7 +188,7 @@ class PlannerAgent:
                 'success': True,
                 'message': f'Generated {len(optimized_plan)} day study plan',
                 'plan': optimized_plan,
-                'summary': self._generate_plan_summary(optimized_plan)
+                'summary': self._generate_plan_summary(optimized_plan, plan_metadata)
             }
             
         except Exception as e:
@@ -88,8 +205,8 @@ class PlannerAgent:
         - Available time per day
         - Difficulty preferences
         """
-        import re
-        
+        user_input_lower = user_input.lower()
+
         study_info = {
             'topics': [],
             'deadlines': {},
@@ -97,18 +214,18 @@ class PlannerAgent:
             'start_date': datetime.now(),
             'sync_calendar': True
         }
-        
+
         # Extract topics
-        topics = self._extract_topics(user_input)
+        topics = self._extract_topics(user_input, user_input_lower)
         study_info['topics'] = topics
-        
+
         # Extract time availability
-        time_match = re.search(r'(\d+)\s*hours?\s*(?:per\s*day|daily|each\s*day)', user_input.lower())
+        time_match = _RE_HOURS.search(user_input_lower)
         if time_match:
             study_info['daily_hours'] = int(time_match.group(1))
-        
+
         # Extract deadline
-        deadline = self._extract_deadline(user_input)
+        deadline = self._extract_deadline(user_input_lower)
         if deadline:
             study_info['deadline'] = deadline
             # Assign same deadline to all topics for now
@@ -124,59 +241,53 @@ class PlannerAgent:
         
         return study_info
     
-    def _extract_topics(self, text: str) -> List[str]:
+    def _extract_topics(self, text: str, text_lower: Optional[str] = None) -> List[str]:
         """Extract study topics from text."""
-        import re
-        
+        if text_lower is None:
+            text_lower = text.lower()
+
         topics = []
-        
-        # Look for common academic subjects
-        common_subjects = [
-            'math', 'calculus', 'algebra', 'geometry', 'statistics',
-            'physics', 'chemistry', 'biology', 'anatomy',
-            'history', 'geography', 'literature', 'english',
-            'computer science', 'programming', 'algorithms',
-            'economics', 'psychology', 'sociology'
-        ]
-        
-        text_lower = text.lower()
-        for subject in common_subjects:
-            if subject in text_lower:
-                topics.append(subject.title())
-        
+
+        # Look for common academic subjects in a single pass
+        if _SUBJECT_AUTOMATON is not None:
+            found = {subject for _, subject in _SUBJECT_AUTOMATON.iter(text_lower)}
+            topics.extend(subject.title() for subject in _COMMON_SUBJECTS if subject in found)
+        else:
+            found = set(_SUBJECT_RE.findall(text_lower))
+            topics.extend(subject.title() for subject in _COMMON_SUBJECTS if subject in found)
+
         # Look for quoted or explicit topics
-        quoted = re.findall(r'["\']([^"\']+)["\']', text)
+        quoted = _RE_QUOTED.findall(text)
         topics.extend(quoted)
-        
+
         # If no topics found, try to extract from 'study X' pattern
-        study_pattern = r'study\s+([a-zA-Z\s]{3,30})(?:\s+and|\s+for|\s+exam|$)'
-        matches = re.findall(study_pattern, text_lower)
+        seen = set(topics)
+        matches = _RE_STUDY.findall(text_lower)
         for match in matches:
             topic = match.strip().title()
-            if topic and topic not in topics:
+            if topic and topic not in seen:
+                seen.add(topic)
                 topics.append(topic)
-        
-        # Remove duplicates
-        topics = list(set(topics))
-        
+
+        # Remove duplicates, keeping first-seen order so downstream
+        # scheduling stays deterministic
+        topics = list(dict.fromkeys(topics))
+
         return topics if topics else ['General Study']
     
-    def _extract_deadline(self, text: str) -> Optional[datetime]:
-        """Extract deadline from natural language."""
-        import re
-        
+    def _extract_deadline(self, text_lower: str) -> Optional[datetime]:
+        """Extract deadline from natural language (expects lowercased text)."""
         today = datetime.now()
-        text_lower = text.lower()
-        
+
         # Check for explicit dates
         if 'next week' in text_lower:
             return today + timedelta(days=7)
         elif 'two weeks' in text_lower:
             return today + timedelta(days=14)
-        elif match := re.search(r'in\s+(\d+)\s+days?', text_lower):
+        elif match := _RE_IN_N_DAYS.search(text_lower):
             days = int(match.group(1))
             return today + timedelta(days=days)
-        elif match := re.search(r'in\s+(\d+)\s+weeks?', text_lower):
+        elif match := _RE_IN_N_WEEKS.search(text_lower):
             weeks = int(match.group(1))
             return today + timedelta(weeks=weeks)
         elif 'tomorrow' in text_lower:
@@ -187,11 +298,15 @@ class PlannerAgent:
         
         return None
     
-    def _create_study_schedule(self, study_info: Dict[str, Any]) -> Dict[str, List[Dict]]:
+    def _create_study_schedule(self, study_info: Dict[str, Any]):
         """
         Create initial study schedule.
-        
+
         Distributes topics across available days.
+
+        Returns (schedule, metadata) where metadata carries the
+        topics_covered and study-session counters accumulated while
+        building, so summarizing the plan needs no second scan.
         """
         topics = study_info['topics']
         daily_hours = study_info['daily_hours']
@@ -209,57 +324,60 @@ class PlannerAgent:
         # Calculate total study hours needed
         total_hours = len(topics) * 5  # 5 hours per topic (rough estimate)
         
-        # Distribute across days
+        # Distribute across days; the remaining-hours branches are
+        # resolved once per daily budget by _day_session_shape
         schedule = {}
         current_date = start_date
         topic_index = 0
-        hours_per_topic = total_hours / len(topics)
-        
-        for day in range(days_available):
-            date_key = (current_date + timedelta(days=day)).strftime('%Y-%m-%d')
-            day_name = (current_date + timedelta(days=day)).strftime('%A')
-            
+        num_topics = len(topics)
+        hours_per_topic = total_hours / num_topics
+
+        study_slots, topic_advance, has_review = _day_session_shape(daily_hours)
+
+        # Summary counters accumulated while building; ordered dict keys
+        # double as an insertion-ordered topic set
+        topics_covered = {}
+        study_session_count = 0
+
+        for _ in range(days_available):
+            day_name = _WEEKDAY_NAMES[current_date.weekday()]
+
             daily_sessions = []
-            remaining_hours = daily_hours
-            
-            # Morning session (9 AM)
-            if remaining_hours >= 2:
-                topic = topics[topic_index % len(topics)]
-                daily_sessions.append({
-                    'time': '09:00',
-                    'activity': f'Study {topic}',
-                    'duration': '2 hours',
-                    'topic': topic,
-                    'session_type': 'focused_study'
-                })
-                remaining_hours -= 2
-            
-            # Afternoon session (2 PM)
-            if remaining_hours >= 2:
-                topic = topics[(topic_index + 1) % len(topics)]
+
+            for time_str, topic_offset in study_slots:
+                topic = topics[(topic_index + topic_offset) % num_topics]
+                topics_covered[topic] = None
+                study_session_count += 1
                 daily_sessions.append({
-                    'time': '14:00',
+                    'time': time_str,
                     'activity': f'Study {topic}',
                     'duration': '2 hours',
                     'topic': topic,
-                    'session_type': 'focused_study'
+                    'session_type': SessionType.FOCUSED_STUDY
                 })
-                remaining_hours -= 2
-                topic_index += 1
-            
+
+            topic_index += topic_advance
+
             # Evening review (7 PM)
-            if remaining_hours >= 1:
+            if has_review:
+                topics_covered['Mixed Review'] = None
+                study_session_count += 1
                 daily_sessions.append({
                     'time': '19:00',
                     'activity': 'Review and practice problems',
                     'duration': '1 hour',
                     'topic': 'Mixed Review',
-                    'session_type': 'review'
+                    'session_type': SessionType.REVIEW
                 })
-            
+
             schedule[day_name] = daily_sessions
-        
-        return schedule
+            current_date += _ONE_DAY
+
+        metadata = {
+            'topics_covered': list(topics_covered),
+            'study_sessions': study_session_count
+        }
+        return schedule, metadata
     
     def _optimize_schedule(self, plan: Dict[str, List[Dict]], study_info: Dict[str, Any]) -> Dict[str, List[Dict]]:
         """
@@ -278,13 +396,13 @@ class PlannerAgent:
                 optimized_sessions.append(session)
                 
                 # Add break after each study session
-                if session['session_type'] == 'focused_study':
+                if session['session_type'] == SessionType.FOCUSED_STUDY:
                     optimized_sessions.append({
                         'time': self._add_minutes_to_time(session['time'], 120),
                         'activity': 'Break',
                         'duration': '15 minutes',
                         'topic': 'Rest',
-                        'session_type': 'break'
+                        'session_type': SessionType.BREAK
                     })
             
             optimized[day] = optimized_sessions
@@ -294,39 +412,45 @@ class PlannerAgent:
     def _add_minutes_to_time(self, time_str: str, minutes: int) -> str:
         """Add minutes to time string (HH:MM format)."""
         try:
-            time_obj = datetime.strptime(time_str, '%H:%M')
-            new_time = time_obj + timedelta(minutes=minutes)
-            return new_time.strftime('%H:%M')
-        except:
+            hours_str, minutes_str = time_str.split(':')
+            total = int(hours_str) * 60 + int(minutes_str) + minutes
+            return f'{(total // 60) % 24:02d}:{total % 60:02d}'
+        except ValueError:
             return time_str
     
     def _sync_to_calendar(self, plan: Dict[str, List[Dict]]):
         """Sync study plan to calendar via Calendar Agent."""
         try:
-            from agents.calendar_agent import CalendarAgent
-            calendar_agent = CalendarAgent()
-            
-            for day, sessions in plan.items():
-                for session in sessions:
-                    if session['session_type'] in ['focused_study', 'review']:
-                        # Create calendar event
-                        event_description = f"{session['activity']} - {day}"
-                        calendar_agent.process_calendar_request(
-                            f"Schedule {event_description} at {session['time']}",
-                            context={'duration': session['duration']}
-                        )
-            
-            logger.info("Study plan synced to calendar")
-            
+            calendar_agent = _get_calendar_agent()
+
+            # Collect the study sessions first, then fan the independent
+            # calendar calls out over a thread pool instead of issuing
+            # them one by one in the nested day/session loop
+            requests = [
+                (f"Schedule {session['activity']} - {day} at {session['time']}",
+                 {'duration': session['duration']})
+                for day, sessions in plan.items()
+                for session in sessions
+                if (1 << session['session_type']) & _STUDY_MASK
+            ]
+
+            if requests:
+                with ThreadPoolExecutor(max_workers=8) as pool:
+                    list(pool.map(
+                        lambda args: calendar_agent.process_calendar_request(args[0], context=args[1]),
+                        requests
+                    ))
+
+            logger.info(f"Study plan synced to calendar ({len(requests)} sessions)")
+
         except Exception as e:
             logger.warning(f"Failed to sync to calendar: {e}")
     
     def _save_plan(self, plan: Dict[str, List[Dict]], study_info: Dict[str, Any]):
         """Save study plan to database."""
         try:
-            from mcp.database_tool import DatabaseTool
-            db = DatabaseTool()
-            
+            db = get_database_tool()
+
             plan_data = {
                 'plan': plan,
                 'study_info': study_info,
@@ -340,25 +464,41 @@ class PlannerAgent:
         except Exception as e:
             logger.warning(f"Failed to save plan: {e}")
     
-    def _generate_plan_summary(self, plan: Dict[str, List[Dict]]) -> Dict[str, Any]:
-        """Generate summary statistics for the plan."""
+    def _generate_plan_summary(
+        self,
+        plan: Dict[str, List[Dict]],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate summary statistics for the plan.
+
+        When the metadata collected during schedule construction is
+        passed in, only the total session count needs a scan; otherwise
+        the counters are recomputed from the plan.
+        """
         total_sessions = sum(len(sessions) for sessions in plan.values())
-        study_sessions = sum(
-            1 for sessions in plan.values()
-            for session in sessions
-            if session['session_type'] in ['focused_study', 'review']
-        )
-        
-        topics_covered = set()
-        for sessions in plan.values():
-            for session in sessions:
-                if session.get('topic') and session['topic'] != 'Rest':
-                    topics_covered.add(session['topic'])
-        
+
+        if metadata is not None:
+            study_sessions = metadata['study_sessions']
+            topics_covered = metadata['topics_covered']
+        else:
+            study_sessions = sum(
+                1 for sessions in plan.values()
+                for session in sessions
+                if (1 << session['session_type']) & _STUDY_MASK
+            )
+
+            topics = {}
+            for sessions in plan.values():
+                for session in sessions:
+                    if session.get('topic') and session['topic'] != 'Rest':
+                        topics[session['topic']] = None
+            topics_covered = list(topics)
+
         return {
             'total_days': len(plan),
             'total_sessions': total_sessions,
             'study_sessions': study_sessions,
-            'topics_covered': list(topics_covered),
+            'topics_covered': topics_covered,
             'estimated_hours': study_sessions * 2  # Rough estimate
         }
\ No newline at end of file
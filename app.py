@@ -11,8 +11,6 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from agents.coordinator import CoordinatorAgent
-from mcp.database_tool import DatabaseTool
 import json
 import os
 
@@ -56,16 +54,49 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+@st.cache_resource
+def get_coordinator():
+    """One CoordinatorAgent (and its model) shared by every session.
+
+    st.session_state is per browser tab, so storing the agent there
+    re-instantiated it — and reloaded the model weights — for each new
+    tab. The import stays here so it is off the module-import path.
+    """
+    from agents.coordinator import CoordinatorAgent
+    return CoordinatorAgent()
+
+
+@st.cache_resource
+def get_db():
+    """One DatabaseTool shared by every session."""
+    from mcp.database_tool import DatabaseTool
+    return DatabaseTool()
+
+
 def initialize_session_state():
     """Initialize session state variables."""
     if 'coordinator' not in st.session_state:
-        st.session_state.coordinator = CoordinatorAgent()
+        st.session_state.coordinator = get_coordinator()
     if 'db' not in st.session_state:
-        st.session_state.db = DatabaseTool()
+        st.session_state.db = get_db()
     if 'current_page' not in st.session_state:
         st.session_state.current_page = "Dashboard"
 
 
+@st.cache_data(ttl=30)
+def _dashboard_counts(_db):
+    """
+    Cached read-only dashboard metrics, fetched in one query.
+
+    Streamlit reruns the whole script on every widget interaction, so
+    without caching these queries run on each rerender. The leading
+    underscore excludes the connection object from the cache key; the
+    TTL plus explicit clears after writes keep the numbers fresh.
+    """
+    counts = _db.get_dashboard_counts()
+    return (counts['flashcards'], counts['events'], counts['study_sessions'])
+
+
 def sidebar_navigation():
     """Render sidebar navigation."""
     st.sidebar.markdown("## 📚 ScholarMate")
@@ -94,20 +125,22 @@ def dashboard_page():
     st.markdown('<div class="main-header">📚 ScholarMate Dashboard</div>', unsafe_allow_html=True)
     
     col1, col2, col3 = st.columns(3)
-    
+
+    flashcard_count, event_count, session_count = _dashboard_counts(st.session_state.db)
+
     with col1:
         st.markdown('<div class="card">', unsafe_allow_html=True)
-        st.metric("📝 Total Flashcards", st.session_state.db.count_flashcards())
+        st.metric("📝 Total Flashcards", flashcard_count)
         st.markdown('</div>', unsafe_allow_html=True)
-    
+
     with col2:
         st.markdown('<div class="card">', unsafe_allow_html=True)
-        st.metric("📅 Upcoming Events", st.session_state.db.count_upcoming_events())
+        st.metric("📅 Upcoming Events", event_count)
         st.markdown('</div>', unsafe_allow_html=True)
-    
+
     with col3:
         st.markdown('<div class="card">', unsafe_allow_html=True)
-        st.metric("📊 Study Sessions", st.session_state.db.count_study_sessions())
+        st.metric("📊 Study Sessions", session_count)
         st.markdown('</div>', unsafe_allow_html=True)
     
     st.markdown("---")
@@ -122,6 +155,7 @@ def dashboard_page():
             if quick_input:
                 with st.spinner("Processing..."):
                     response = st.session_state.coordinator.handle_request(quick_input)
+                    _dashboard_counts.clear()
                     st.markdown(f'<div class="success-box">{response["message"]}</div>', unsafe_allow_html=True)
     
     with col2:
@@ -148,6 +182,7 @@ def calendar_page():
                     st.write(f"**Description:** {event.get('description', 'No description')}")
                     if st.button(f"Delete Event", key=f"del_{event['id']}"):
                         st.session_state.db.delete_event(event['id'])
+                        _dashboard_counts.clear()
                         st.rerun()
         else:
             st.info("No upcoming events. Add one below!")
@@ -165,6 +200,7 @@ def calendar_page():
                 with st.spinner("Creating event..."):
                     response = st.session_state.coordinator.handle_request(event_input, intent_override="calendar")
                     if response.get("success"):
+                        _dashboard_counts.clear()
                         st.markdown(f'<div class="success-box">✅ {response["message"]}</div>', unsafe_allow_html=True)
                         st.rerun()
                     else:
@@ -195,6 +231,7 @@ def summarizer_page():
                     )
                     
                     if response.get("success"):
+                        _dashboard_counts.clear()
                         st.markdown("### 📋 Summary")
                         st.markdown(f'<div class="card">{response["summary"]}</div>', unsafe_allow_html=True)
                         
@@ -214,18 +251,37 @@ def summarizer_page():
             
             if st.button("Process File", type="primary"):
                 with st.spinner("Processing file..."):
-                    # Save file temporarily
-                    file_path = f"data/uploads/{uploaded_file.name}"
-                    os.makedirs("data/uploads", exist_ok=True)
-                    with open(file_path, "wb") as f:
-                        f.write(uploaded_file.getbuffer())
-                    
-                    response = st.session_state.coordinator.handle_request(
-                        f"Summarize file: {file_path}",
-                        intent_override="summarize"
-                    )
+                    # Parse common formats in memory instead of writing
+                    # the upload to disk and re-reading it
+                    suffix = os.path.splitext(uploaded_file.name)[1].lower()
+                    lecture_text = None
+
+                    if suffix == '.pdf':
+                        from mcp.pdf_parser_tool import PDFParser
+                        lecture_text = PDFParser().extract_text_bytes(bytes(uploaded_file.getbuffer()))
+                    elif suffix == '.txt':
+                        lecture_text = uploaded_file.getvalue().decode('utf-8', errors='replace')
+
+                    if lecture_text:
+                        response = st.session_state.coordinator.handle_request(
+                            lecture_text,
+                            intent_override="summarize"
+                        )
+                    else:
+                        # Formats the in-memory path does not handle
+                        # (e.g. docx) still go through the file pipeline
+                        file_path = f"data/uploads/{uploaded_file.name}"
+                        os.makedirs("data/uploads", exist_ok=True)
+                        with open(file_path, "wb") as f:
+                            f.write(uploaded_file.getbuffer())
+
+                        response = st.session_state.coordinator.handle_request(
+                            f"Summarize file: {file_path}",
+                            intent_override="summarize"
+                        )
                     
                     if response.get("success"):
+                        _dashboard_counts.clear()
                         st.success("File processed successfully!")
                         st.markdown("### 📋 Summary")
                         st.write(response["summary"])
@@ -254,6 +310,7 @@ def planner_page():
                     )
                     
                     if response.get("success"):
+                        _dashboard_counts.clear()
                         st.markdown("### 📅 Your Study Plan")
                         plan = response.get("plan", {})
                         
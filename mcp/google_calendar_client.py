@@ -4,12 +4,18 @@ Implements Model Context Protocol for calendar operations.
 """
 
 import logging
+import re
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 import os
 
 logger = logging.getLogger(__name__)
 
+# Durations like "2 hours", "90 minutes", "1.5 hours"; one combined
+# pattern means one scan per event build, with the unit group deciding
+# the conversion
+_DURATION_RE = re.compile(r'([\d.]+)\s*(hours?|minutes?)')
+
 
 class GoogleCalendarClient:
     """
@@ -21,6 +27,7 @@ class GoogleCalendarClient:
         """Initialize Google Calendar client."""
         self.calendar_available = False
         self.service = None
+        self._events = None
         
         try:
             self._initialize_calendar_service()
@@ -68,6 +75,9 @@ class GoogleCalendarClient:
                     token.write(creds.to_json())
             
             self.service = build('calendar', 'v3', credentials=creds)
+            # Build the events() resource once; each call otherwise
+            # re-creates the resource object from the discovery document
+            self._events = self.service.events()
             self.calendar_available = True
             logger.info("Google Calendar service initialized successfully")
             
@@ -98,7 +108,7 @@ class GoogleCalendarClient:
             event = self._build_event_object(event_details)
             
             # Create event via API
-            created_event = self.service.events().insert(
+            created_event = self._events.insert(
                 calendarId='primary',
                 body=event
             ).execute()
@@ -119,6 +129,65 @@ class GoogleCalendarClient:
                 'message': f'Failed to create event: {str(e)}'
             }
     
+    def create_events_bulk(self, events_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Create several calendar events in one batched HTTP round-trip.
+
+        Args:
+            events_list: List of event detail dictionaries (same shape as
+                create_event takes)
+
+        Returns:
+            Success status, created event IDs, and any per-event errors
+        """
+        try:
+            if not self.calendar_available:
+                return {
+                    'success': False,
+                    'message': 'Google Calendar not available - using local storage',
+                    'local_only': True,
+                    'event_ids': []
+                }
+
+            if not events_list:
+                return {'success': True, 'message': 'No events to create', 'event_ids': []}
+
+            event_ids = []
+            errors = []
+
+            def _collect(request_id, response, exception):
+                if exception is not None:
+                    errors.append(str(exception))
+                else:
+                    event_ids.append(response.get('id'))
+
+            # One batch request replaces N sequential inserts, so the
+            # network latency is paid once for the whole import
+            batch = self.service.new_batch_http_request(callback=_collect)
+            for details in events_list:
+                batch.add(self._events.insert(
+                    calendarId='primary',
+                    body=self._build_event_object(details)
+                ))
+            batch.execute()
+
+            logger.info(f"Batch-created {len(event_ids)} calendar events ({len(errors)} failures)")
+
+            return {
+                'success': not errors,
+                'message': f'Created {len(event_ids)} of {len(events_list)} events',
+                'event_ids': event_ids,
+                'errors': errors
+            }
+
+        except Exception as e:
+            logger.error(f"Error batch-creating calendar events: {e}")
+            return {
+                'success': False,
+                'message': f'Failed to create events: {str(e)}',
+                'event_ids': []
+            }
+
     def _build_event_object(self, details: Dict[str, Any]) -> Dict[str, Any]:
         """Build Google Calendar event object from details."""
         title = details.get('title', 'Untitled Event')
@@ -161,17 +230,11 @@ class GoogleCalendarClient:
     
     def _parse_duration(self, duration_str: str) -> float:
         """Parse duration string to hours (float)."""
-        import re
-        
-        # Match patterns like "2 hours", "90 minutes", "1.5 hours"
-        hour_match = re.search(r'([\d.]+)\s*hours?', duration_str)
-        if hour_match:
-            return float(hour_match.group(1))
-        
-        minute_match = re.search(r'(\d+)\s*minutes?', duration_str)
-        if minute_match:
-            return float(minute_match.group(1)) / 60
-        
+        match = _DURATION_RE.search(duration_str)
+        if match:
+            value = float(match.group(1))
+            return value / 60 if match.group(2).startswith('m') else value
+
         # Default to 1 hour
         return 1.0
     
@@ -197,12 +260,13 @@ class GoogleCalendarClient:
             if not start_date:
                 start_date = datetime.utcnow()
             
-            events_result = self.service.events().list(
+            events_result = self._events.list(
                 calendarId='primary',
                 timeMin=start_date.isoformat() + 'Z',
                 maxResults=max_results,
                 singleEvents=True,
-                orderBy='startTime'
+                orderBy='startTime',
+                fields='items(id,summary,description,start,end),nextPageToken'
             ).execute()
             
             events = events_result.get('items', [])
@@ -240,7 +304,7 @@ class GoogleCalendarClient:
                 }
             
             # Get existing event
-            event = self.service.events().get(
+            event = self._events.get(
                 calendarId='primary',
                 eventId=event_id
             ).execute()
@@ -252,7 +316,7 @@ class GoogleCalendarClient:
                 event['description'] = updates['description']
             
             # Update event
-            updated_event = self.service.events().update(
+            updated_event = self._events.update(
                 calendarId='primary',
                 eventId=event_id,
                 body=event
@@ -288,7 +352,7 @@ class GoogleCalendarClient:
                     'message': 'Google Calendar not available'
                 }
             
-            self.service.events().delete(
+            self._events.delete(
                 calendarId='primary',
                 eventId=event_id
             ).execute()
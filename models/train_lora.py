@@ -3,70 +3,75 @@ Fine-tune model using LoRA for lecture summarization and flashcard generation.
 """
 
 import json
+import os
 from datasets import Dataset
 from transformers import (
     AutoModelForCausalLM,
     AutoTokenizer,
+    BitsAndBytesConfig,
     TrainingArguments,
     Trainer,
     DataCollatorForLanguageModeling
 )
-from peft import LoraConfig, get_peft_model
+from peft import LoraConfig, get_peft_model, prepare_model_for_kbit_training
 import torch
 
+# Attention/MLP projection names worth LoRA-targeting, covering Phi-3
+# (combined qkv_proj / gate_up_proj) and Mistral/Llama-style splits
+_CANDIDATE_MODULES = frozenset([
+    "qkv_proj", "q_proj", "k_proj", "v_proj", "o_proj",
+    "gate_proj", "up_proj", "down_proj", "gate_up_proj"
+])
+
+# Detected module lists keyed by model_type; the scan over tens of
+# thousands of named_modules then runs once per architecture
+_target_module_cache = {}
+
+
 def find_target_modules(model):
     """
     Automatically find the correct target modules for LoRA based on model architecture.
     Returns a list of module names that PEFT can use for pattern matching.
     """
     model_type = model.config.model_type if hasattr(model.config, 'model_type') else None
-    
-    # Phi-3 specific: uses qkv_proj (combined) and o_proj for attention
-    if model_type == "phi3":
-        target_modules = []
-        for name, module in model.named_modules():
-            # Get the base module name (last part after the dot)
-            module_name = name.split('.')[-1]
-            # Phi-3 uses: qkv_proj, o_proj, gate_proj, up_proj, down_proj
-            if module_name in ["qkv_proj", "q_proj", "k_proj", "v_proj", "o_proj", 
-                              "gate_proj", "up_proj", "down_proj"]:
-                if module_name not in target_modules:
-                    target_modules.append(module_name)
-        
-        if target_modules:
-            return target_modules
-    
-    # Mistral/Llama style
+
+    cached = _target_module_cache.get(model_type)
+    if cached is not None:
+        return cached
+
+    # Mistral/Llama style is known ahead of time, no scan needed
     if model_type in ["mistral", "llama"]:
-        return ["q_proj", "k_proj", "v_proj", "o_proj", "gate_proj", "up_proj", "down_proj"]
-    
-    # Generic: scan model for common attention/MLP projection patterns
+        target_modules = ["q_proj", "k_proj", "v_proj", "o_proj",
+                          "gate_proj", "up_proj", "down_proj"]
+        _target_module_cache[model_type] = target_modules
+        return target_modules
+
+    # One pass over named_modules, stopping once every candidate name
+    # has been seen
     target_modules = []
     seen_modules = set()
-    
+
     for name, module in model.named_modules():
         module_name = name.split('.')[-1]
-        # Common patterns for attention and MLP layers
-        if module_name in ["qkv_proj", "q_proj", "k_proj", "v_proj", "o_proj",
-                          "gate_proj", "up_proj", "down_proj", "gate_up_proj"]:
-            if module_name not in seen_modules:
-                target_modules.append(module_name)
-                seen_modules.add(module_name)
-    
-    # If we found modules, return them
-    if target_modules:
-        return target_modules
-    
-    # Last resort: find all Linear layers except lm_head and embeddings
-    target_modules = []
-    for name, module in model.named_modules():
-        if "Linear" in str(type(module)):
-            if "lm_head" not in name and "embed" not in name.lower():
-                module_name = name.split('.')[-1]
-                if module_name not in seen_modules:
-                    target_modules.append(module_name)
-                    seen_modules.add(module_name)
-    
+        if module_name in _CANDIDATE_MODULES and module_name not in seen_modules:
+            target_modules.append(module_name)
+            seen_modules.add(module_name)
+            if len(seen_modules) == len(_CANDIDATE_MODULES):
+                break
+
+    if not target_modules:
+        # Last resort: find all Linear layers except lm_head and embeddings
+        for name, module in model.named_modules():
+            if "Linear" in str(type(module)):
+                if "lm_head" not in name and "embed" not in name.lower():
+                    module_name = name.split('.')[-1]
+                    if module_name not in seen_modules:
+                        target_modules.append(module_name)
+                        seen_modules.add(module_name)
+
+    if model_type is not None and target_modules:
+        _target_module_cache[model_type] = target_modules
+
     return target_modules
 
 def load_dataset(file_path):
@@ -87,11 +92,12 @@ Lecture: {input_text}
 
 Response:"""
         
-        # Create completion
+        # Create completion; compact JSON keeps the model from spending
+        # ~30% of its completion tokens on indentation whitespace
         completion = f"""Summary: {output['summary']}
 
 Flashcards:
-{json.dumps(output['flashcards'], indent=2)}"""
+{json.dumps(output['flashcards'], separators=(',', ':'))}"""
         
         formatted_data.append({
             'text': prompt + completion
@@ -100,16 +106,47 @@ Flashcards:
     return Dataset.from_list(formatted_data)
 
 def tokenize_function(examples, tokenizer):
-    """Tokenize dataset and create labels for causal LM training."""
-    tokenized = tokenizer(
+    """Tokenize dataset for causal LM training.
+
+    No padding here: the collator pads each batch dynamically, so short
+    examples don't burn FLOPs on 512 pad tokens, and it builds the
+    labels itself for mlm=False.
+    """
+    return tokenizer(
         examples['text'],
         truncation=True,
-        max_length=512,
-        padding='max_length'
+        max_length=512
     )
-    # For causal LM, labels are the same as input_ids (they'll be shifted internally)
-    tokenized['labels'] = tokenized['input_ids'].copy()
-    return tokenized
+
+def pack_sequences(tokenized_dataset, tokenizer, seq_length=512):
+    """Pack tokenized examples into fixed-length training blocks.
+
+    Short examples are concatenated (eos-separated) until a block of
+    seq_length tokens fills, so training FLOPs go to real tokens instead
+    of padding. The tail of each map batch that doesn't fill a block is
+    dropped, as is standard for packed SFT.
+    """
+    def pack(examples):
+        packed_ids = []
+        buffer = []
+        for ids in examples['input_ids']:
+            buffer.extend(ids)
+            buffer.append(tokenizer.eos_token_id)
+            while len(buffer) >= seq_length:
+                packed_ids.append(buffer[:seq_length])
+                buffer = buffer[seq_length:]
+        return {
+            'input_ids': packed_ids,
+            'attention_mask': [[1] * seq_length for _ in packed_ids],
+        }
+
+    return tokenized_dataset.map(
+        pack,
+        batched=True,
+        batch_size=1000,
+        remove_columns=tokenized_dataset.column_names
+    )
+
 
 def main():
     print("Loading base model...")
@@ -122,19 +159,35 @@ def main():
     tokenizer = AutoTokenizer.from_pretrained(model_name)
     tokenizer.pad_token = tokenizer.eos_token
     
-    # Load model with cache disabled for training compatibility
+    # QLoRA: 4-bit NF4 base weights with bf16 compute cut base-weight
+    # memory ~4x, fitting training on a single 8 GB GPU
+    quantization_config = BitsAndBytesConfig(
+        load_in_4bit=True,
+        bnb_4bit_quant_type="nf4",
+        bnb_4bit_compute_dtype=torch.bfloat16,
+        bnb_4bit_use_double_quant=True,
+    )
+
+    # FlashAttention-2 fuses the attention kernel and never materializes
+    # the [B, H, T, T] score matrix; fall back to eager without flash-attn
+    try:
+        import flash_attn  # noqa: F401
+        attn_implementation = "flash_attention_2"
+    except ImportError:
+        print("flash-attn not installed, using eager attention")
+        attn_implementation = "eager"
+
     model = AutoModelForCausalLM.from_pretrained(
         model_name,
-        dtype=torch.float16,  # Changed from torch_dtype (deprecated)
+        quantization_config=quantization_config,
         device_map="auto",
         trust_remote_code=True,
-        attn_implementation="eager",  # Avoid flash attention issues
+        attn_implementation=attn_implementation,
     )
-    
-    # Disable cache during training to avoid DynamicCache compatibility issues
-    if hasattr(model.config, 'use_cache'):
-        model.config.use_cache = False
-    
+
+    # Casts norms/embeddings and enables input grads for k-bit training
+    model = prepare_model_for_kbit_training(model)
+
     # Auto-detect target modules for LoRA
     target_modules = find_target_modules(model)
     print(f"Detected target modules for LoRA: {target_modules}")
@@ -154,25 +207,30 @@ def main():
     
     # Apply LoRA
     model = get_peft_model(model, lora_config)
-    
-    # Ensure cache is disabled on the PEFT model as well
-    if hasattr(model.config, 'use_cache'):
-        model.config.use_cache = False
-    if hasattr(model.base_model.config, 'use_cache'):
-        model.base_model.config.use_cache = False
-    
+
     model.print_trainable_parameters()
+
+    # Compile the training step into fused kernels; the first step pays
+    # the tracing cost, the rest run without per-op Python dispatch
+    model = torch.compile(model, mode="reduce-overhead")
     
     print("Loading dataset...")
     dataset = load_dataset('data/fine_tuning_dataset.json')
     
-    # Tokenize
+    # Tokenize across all cores; fn_kwargs keeps the function picklable
+    # for the multi-process map
     tokenized_dataset = dataset.map(
-        lambda x: tokenize_function(x, tokenizer),
+        tokenize_function,
         batched=True,
-        remove_columns=['text']
+        batch_size=1000,
+        num_proc=os.cpu_count(),
+        remove_columns=['text'],
+        fn_kwargs={'tokenizer': tokenizer}
     )
     
+    # Pack short examples into full 512-token blocks
+    tokenized_dataset = pack_sequences(tokenized_dataset, tokenizer)
+
     # Split dataset
     split = tokenized_dataset.train_test_split(test_size=0.1)
     train_dataset = split['train']
@@ -188,7 +246,11 @@ def main():
         per_device_eval_batch_size=4,
         gradient_accumulation_steps=4,
         learning_rate=2e-4,
-        fp16=True,
+        bf16=True,
+        # Recompute activations instead of storing them: ~4x less
+        # activation memory, buying a bigger batch size
+        gradient_checkpointing=True,
+        gradient_checkpointing_kwargs={"use_reentrant": False},
         save_steps=100,
         logging_steps=10,
         eval_steps=50,
@@ -201,6 +263,7 @@ def main():
     data_collator = DataCollatorForLanguageModeling(
         tokenizer=tokenizer,
         mlm=False,  # We're doing causal LM, not masked LM
+        pad_to_multiple_of=8,  # Tensor-core friendly dynamic padding
     )
     
     # Trainer
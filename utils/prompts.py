@@ -3,64 +3,150 @@ Prompt Templates - Structured prompts for model inference.
 Contains templates for summarization, flashcard generation, and planning.
 """
 
+from functools import lru_cache
+
+# Shared static prefix for the lecture-grounded tasks. Both the summary
+# and flashcard prompts open with this exact byte sequence followed by
+# the lecture, so inference backends with prefix/KV caching can reuse
+# the encoded prefix+lecture between the two back-to-back calls made
+# per lecture.
+_LECTURE_TASK_PREFIX = """You are an expert educational content assistant working with lecture material.
+
+Lecture Content:
+"""
+
+# Hot-path lecture templates are assembled once at import time; the
+# getters then do a single format_map instead of rebuilding the
+# multi-KB literal per call
+_SUMMARY_TMPL = _LECTURE_TASK_PREFIX + """{content}
+
+Task: Create a concise, accurate summary of the lecture content above.
+
+Guidelines:
+- Extract only the most important concepts and key points
+- Maintain factual accuracy
+- Use clear, concise language
+- Organize information logically
+- Length: 3-5 sentences
+
+Summary:"""
+
+_FLASHCARD_BODY = """
+
+Task: Generate high-quality flashcards from the lecture content above.
+
+Guidelines:
+- Create clear, specific questions
+- Provide complete, accurate answers
+- Focus on key concepts, definitions, and relationships
+- Mix different question types (definitions, applications, comparisons)
+- Format: Return as JSON array with 'question', 'answer', and 'category' fields
+
+Flashcards (JSON format):
+["""
+
+# One template per branch keeps conditionals out of the format path
+_FLASHCARD_TMPL = _LECTURE_TASK_PREFIX + "{content}" + _FLASHCARD_BODY
+_FLASHCARD_WITH_SUMMARY_TMPL = (
+    _LECTURE_TASK_PREFIX + "{content}\n\nSummary:\n{summary}" + _FLASHCARD_BODY
+)
+
+_COMBINED_TMPL = _LECTURE_TASK_PREFIX + """{content}
+
+Task: Summarize the lecture content above and generate high-quality flashcards from it.
+
+Guidelines:
+- Summary: 3-5 clear, factually accurate sentences covering the key points
+- Flashcards: clear, specific questions with complete, accurate answers
+- Focus on key concepts, definitions, and relationships
+- Format: Return one JSON object of the form
+  {{"summary": "...", "flashcards": [{{"question": "...", "answer": "...", "category": "..."}}]}}
+
+Response (JSON format):
+{{"""
+
+# Static system prompt; a constant avoids rebuilding (or even calling a
+# function for) the same literal on every request
+SYSTEM_PROMPT = """You are ScholarMate, an AI-powered academic assistant designed to help students succeed.
+
+Your capabilities:
+- Summarizing lecture notes and educational content
+- Generating study flashcards from any topic
+- Creating personalized study schedules
+- Managing academic calendars and deadlines
+- Evaluating learning progress
+- Providing study recommendations
+
+Your principles:
+- Accuracy: Provide factually correct information
+- Clarity: Use clear, student-friendly language
+- Personalization: Adapt to individual learning needs
+- Encouragement: Support and motivate students
+- Efficiency: Respect students' time
+
+When interacting:
+- Be concise but thorough
+- Ask clarifying questions when needed
+- Provide actionable advice
+- Use examples when helpful
+- Stay focused on educational goals"""
+
 
 class PromptTemplates:
     """Collection of prompt templates for various tasks."""
-    
+
+    LECTURE_TASK_PREFIX = _LECTURE_TASK_PREFIX
+
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_summary_prompt(content: str) -> str:
         """
         Generate prompt for lecture summarization.
-        
+
+        Rendered prompts are memoized: retries and repeat runs over the
+        same lecture skip the formatting entirely.
+
         Args:
             content: Lecture content to summarize
-            
+
         Returns:
             Formatted prompt
         """
-        return f"""You are an expert educational content summarizer. Your task is to create a concise, accurate summary of the following lecture content.
-
-Guidelines:
-- Extract only the most important concepts and key points
-- Maintain factual accuracy
-- Use clear, concise language
-- Organize information logically
-- Length: 3-5 sentences
-
-Lecture Content:
-{content}
+        return _SUMMARY_TMPL.format_map({'content': content})
 
-Summary:"""
-    
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_flashcard_prompt(content: str, summary: str = "") -> str:
         """
         Generate prompt for flashcard creation.
-        
+
         Args:
             content: Lecture content
             summary: Optional summary for context
-            
+
         Returns:
             Formatted prompt
         """
-        context_section = f"\n\nSummary:\n{summary}" if summary else ""
-        
-        return f"""You are an expert educational content creator. Generate high-quality flashcards from the following lecture content.
+        if summary:
+            return _FLASHCARD_WITH_SUMMARY_TMPL.format_map(
+                {'content': content, 'summary': summary}
+            )
+        return _FLASHCARD_TMPL.format_map({'content': content})
 
-Guidelines:
-- Create clear, specific questions
-- Provide complete, accurate answers
-- Focus on key concepts, definitions, and relationships
-- Mix different question types (definitions, applications, comparisons)
-- Format: Return as JSON array with 'question', 'answer', and 'category' fields
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def get_combined_prompt(content: str) -> str:
+        """
+        Generate prompt producing the summary and flashcards in one call.
 
-Lecture Content:
-{content}{context_section}
+        Args:
+            content: Lecture content
+
+        Returns:
+            Formatted prompt requesting a single JSON object
+        """
+        return _COMBINED_TMPL.format_map({'content': content})
 
-Flashcards (JSON format):
-["""
-    
     @staticmethod
     def get_planning_prompt(goals: str, constraints: str) -> str:
         """
@@ -120,6 +206,7 @@ Evaluation (JSON format):
 {{"""
     
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_intent_detection_prompt(user_input: str) -> str:
         """
         Generate prompt for intent detection.
@@ -487,33 +574,11 @@ Progress Analysis:"""
     def build_system_prompt() -> str:
         """
         Build the system prompt for the AI assistant.
-        
+
         Returns:
             Comprehensive system prompt
         """
-        return """You are ScholarMate, an AI-powered academic assistant designed to help students succeed.
-
-Your capabilities:
-- Summarizing lecture notes and educational content
-- Generating study flashcards from any topic
-- Creating personalized study schedules
-- Managing academic calendars and deadlines
-- Evaluating learning progress
-- Providing study recommendations
-
-Your principles:
-- Accuracy: Provide factually correct information
-- Clarity: Use clear, student-friendly language
-- Personalization: Adapt to individual learning needs
-- Encouragement: Support and motivate students
-- Efficiency: Respect students' time
-
-When interacting:
-- Be concise but thorough
-- Ask clarifying questions when needed
-- Provide actionable advice
-- Use examples when helpful
-- Stay focused on educational goals"""
+        return SYSTEM_PROMPT
     
     @staticmethod
     def get_context_aware_prompt(user_input: str, context: dict) -> str:
@@ -4,13 +4,117 @@ Implements scheduling algorithms and optimization strategies.
 """
 
 import logging
+from functools import lru_cache
 from typing import Dict, List, Tuple, Any
-from datetime import datetime, timedelta
-import random
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
 
+def _to_min(time_str: str) -> int:
+    """Parse an HH:MM string into minutes since midnight."""
+    hours, minutes = time_str.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def _from_min(minutes: int) -> str:
+    """Format minutes since midnight back to HH:MM, wrapping at 24h."""
+    return '{:02d}:{:02d}'.format(*divmod(minutes % 1440, 60))
+
+
+@lru_cache(maxsize=4096)
+def _add_minutes_cached(time_str: str, minutes: int) -> str:
+    """Add minutes to an HH:MM string, memoized.
+
+    Time arithmetic happens on plain ints; strings exist only at the
+    boundary, and each unique (time, offset) pair is converted once
+    across all add_breaks calls.
+    """
+    try:
+        return _from_min(_to_min(time_str) + minutes)
+    except (ValueError, TypeError, AttributeError):
+        return time_str
+
+# Spaced-repetition review offsets in days after first study:
+# Ebbinghaus-style dense-to-sparse spacing; offsets past the plan
+# length are simply skipped
+_REVIEW_INTERVALS = (1, 2, 4, 7, 15, 30)
+
+# Session lengths depend only on 3 difficulty buckets x 24 hours, so
+# the whole table is evaluated once at import: rows are (hard, moderate,
+# easy) base lengths 45/60/90 with the time-of-day factors applied
+def _build_session_len_table() -> Tuple[Tuple[int, ...], ...]:
+    table = []
+    for base_length in (45, 60, 90):
+        row = []
+        for hour in range(24):
+            if 6 <= hour < 12:      # morning: optimal for difficult tasks
+                row.append(int(base_length * 1.1))
+            elif 18 <= hour < 22:   # evening: better for review
+                row.append(int(base_length * 0.9))
+            else:
+                row.append(base_length)
+        table.append(tuple(row))
+    return tuple(table)
+
+
+_SESSION_LEN = _build_session_len_table()
+
+# Estimated mastery hours by (difficulty decile, knowledge decile),
+# evaluated once at import. The knowledge discount uses an FSRS-style
+# sublinear exponent: early knowledge closes the gap faster than the
+# old linear (1 - k) factor assumed
+def _build_hours_table() -> Tuple[Tuple[int, ...], ...]:
+    return tuple(
+        tuple(
+            max(1, round(10 * (0.5 + 1.5 * i / 10) * (1 - j / 10) ** 0.9))
+            for j in range(11)
+        )
+        for i in range(11)
+    )
+
+
+_HOURS_LUT = _build_hours_table()
+
+def _normalize(schedule: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+    """Normalize a schedule to one session representation (dicts).
+
+    optimize_topic_distribution emits (topic, hours) tuples while the
+    other passes emit dicts; converting tuples once here lets every
+    downstream loop use plain dict access with no per-session
+    isinstance dispatch.
+    """
+    return {
+        day: [
+            {'topic': session[0], 'hours': session[1], 'session_type': 'focused_study'}
+            if isinstance(session, tuple) else session
+            for session in sessions
+        ]
+        for day, sessions in schedule.items()
+    }
+
+
+# Full shape of a review session; emitted via .copy() plus two field
+# writes, which reuses the template's final hash-table layout instead
+# of rebuilding a five-key dict from scratch per review
+_REVIEW_TEMPLATE = {
+    'time': '20:00',
+    'activity': '',
+    'duration': '30 minutes',
+    'topic': '',
+    'session_type': 'review',
+}
+
+# Same idea for break sessions: only 'time' varies per emission
+_BREAK_TEMPLATE = {
+    'time': '',
+    'activity': 'Break',
+    'duration': '15 minutes',
+    'topic': 'Rest',
+    'session_type': 'break',
+}
+
+
 class SchedulerUtils:
     """
     Utility functions for study schedule optimization.
@@ -34,43 +138,34 @@ class SchedulerUtils:
             Dictionary mapping day to list of (topic, hours) tuples
         """
         schedule = {}
-        
+
         # Calculate total hours and hours per topic
         total_hours = available_days * daily_hours
         hours_per_topic = max(1, total_hours // len(topics))
-        
-        # Distribute topics
-        current_day = 0
-        hours_remaining_today = daily_hours
-        
-        for topic in topics:
-            topic_hours = hours_per_topic
-            
-            while topic_hours > 0:
-                day_key = f"Day {current_day + 1}"
-                
+
+        # Each topic occupies the closed-form hour range
+        # [t * hours_per_topic, (t + 1) * hours_per_topic) of the plan,
+        # split at day boundaries: one iteration per day span instead of
+        # one per allocated hour. Clamping each span to total capacity
+        # up front means neither loop needs a day-bound check
+        for t, topic in enumerate(topics):
+            start = t * hours_per_topic
+            if start >= total_hours:
+                break
+            end = min(start + hours_per_topic, total_hours)
+
+            pos = start
+            while pos < end:
+                day = pos // daily_hours
+                day_key = f"Day {day + 1}"
                 if day_key not in schedule:
                     schedule[day_key] = []
-                
-                # Allocate hours for this day
-                hours_to_allocate = min(topic_hours, hours_remaining_today)
-                
-                if hours_to_allocate > 0:
-                    schedule[day_key].append((topic, hours_to_allocate))
-                    topic_hours -= hours_to_allocate
-                    hours_remaining_today -= hours_to_allocate
-                
-                # Move to next day if current day is full
-                if hours_remaining_today <= 0:
-                    current_day += 1
-                    hours_remaining_today = daily_hours
-                    
-                    if current_day >= available_days:
-                        break
-            
-            if current_day >= available_days:
-                break
-        
+
+                # Hours until the topic ends or the day fills up
+                allocated = min((day + 1) * daily_hours, end) - pos
+                schedule[day_key].append((topic, allocated))
+                pos += allocated
+
         return schedule
     
     @staticmethod
@@ -81,50 +176,47 @@ class SchedulerUtils:
         """
         Apply spaced repetition principle to schedule.
         
-        Adds review sessions at optimal intervals (1 day, 3 days, 7 days).
+        Adds review sessions at the Ebbinghaus-spaced intervals in
+        _REVIEW_INTERVALS (1, 2, 4, 7, 15, 30 days after first study).
         """
-        enhanced_schedule = schedule.copy()
-        days = sorted(schedule.keys())
-        
+        # _normalize builds fresh inner lists, so it doubles as the
+        # defensive copy that keeps the caller's schedule unmutated
+        enhanced_schedule = _normalize(schedule)
+        days = sorted(enhanced_schedule.keys())
+        # O(1) day lookups instead of a linear days.index() per topic
+        # per interval
+        day_index = {d: i for i, d in enumerate(days)}
+
         # Track when each topic was first studied
         topic_first_appearance = {}
-        
+
         for day in days:
-            sessions = schedule[day]
-            for session in sessions:
-                if isinstance(session, dict):
-                    topic = session.get('topic')
-                elif isinstance(session, tuple):
-                    topic = session[0]
-                else:
-                    continue
-                
+            for session in enhanced_schedule[day]:
+                topic = session.get('topic')
                 if topic not in topic_first_appearance:
                     topic_first_appearance[topic] = day
         
-        # Add review sessions
+        # Collect review sessions per day, then merge with one extend
+        # per day instead of appending them one at a time
+        reviews_by_day = {}
         for topic, first_day in topic_first_appearance.items():
-            # Calculate review days (1, 3, 7 days after first study)
-            review_intervals = [1, 3, 7]
-            
-            for interval in review_intervals:
-                review_day_idx = days.index(first_day) + interval
-                
+            # Schedule reviews at each _REVIEW_INTERVALS offset that
+            # still falls inside the plan
+            first_day_idx = day_index[first_day]
+
+            for interval in _REVIEW_INTERVALS:
+                review_day_idx = first_day_idx + interval
+
                 if review_day_idx < len(days):
                     review_day = days[review_day_idx]
-                    
-                    # Add review session
-                    review_session = {
-                        'time': '20:00',
-                        'activity': f'Review {topic}',
-                        'duration': '30 minutes',
-                        'topic': topic,
-                        'session_type': 'review'
-                    }
-                    
-                    if review_day in enhanced_schedule:
-                        enhanced_schedule[review_day].append(review_session)
-        
+                    review = _REVIEW_TEMPLATE.copy()
+                    review['activity'] = f'Review {topic}'
+                    review['topic'] = topic
+                    reviews_by_day.setdefault(review_day, []).append(review)
+
+        for review_day, reviews in reviews_by_day.items():
+            enhanced_schedule[review_day].extend(reviews)
+
         return enhanced_schedule
     
     @staticmethod
@@ -142,33 +234,36 @@ class SchedulerUtils:
             topic_difficulty: Dictionary mapping topics to difficulty (0-1)
         """
         balanced_schedule = {}
-        
-        for day, sessions in schedule.items():
+
+        # Resolve the > 0.7 threshold once per call: the per-session test
+        # becomes a set membership instead of a dict lookup plus float
+        # compare (unknown topics default to 0.5, i.e. not hard)
+        hard_topics = {t for t, d in topic_difficulty.items() if d > 0.7}
+
+        for day, sessions in _normalize(schedule).items():
             day_sessions = []
             easy_sessions = []
             hard_sessions = []
-            
+
             # Separate by difficulty
             for session in sessions:
-                if isinstance(session, dict):
-                    topic = session.get('topic', '')
-                else:
-                    continue
-                
-                difficulty = topic_difficulty.get(topic, 0.5)
-                
-                if difficulty > 0.7:
+                if session.get('topic', '') in hard_topics:
                     hard_sessions.append(session)
                 else:
                     easy_sessions.append(session)
             
-            # Interleave hard and easy sessions
-            while hard_sessions or easy_sessions:
-                if hard_sessions:
-                    day_sessions.append(hard_sessions.pop(0))
-                if easy_sessions:
-                    day_sessions.append(easy_sessions.pop(0))
-            
+            # Interleave hard and easy sessions; index counters instead
+            # of pop(0), which shifts the whole list on every call
+            hard_idx = easy_idx = 0
+            n_hard, n_easy = len(hard_sessions), len(easy_sessions)
+            while hard_idx < n_hard or easy_idx < n_easy:
+                if hard_idx < n_hard:
+                    day_sessions.append(hard_sessions[hard_idx])
+                    hard_idx += 1
+                if easy_idx < n_easy:
+                    day_sessions.append(easy_sessions[easy_idx])
+                    easy_idx += 1
+
             balanced_schedule[day] = day_sessions
         
         return balanced_schedule
@@ -186,25 +281,21 @@ class SchedulerUtils:
             break_interval: Minutes between breaks
         """
         schedule_with_breaks = {}
-        
-        for day, sessions in schedule.items():
+
+        for day, sessions in _normalize(schedule).items():
             enhanced_sessions = []
-            
+
             for i, session in enumerate(sessions):
                 enhanced_sessions.append(session)
-                
+
                 # Add break after study sessions (not after breaks themselves)
-                if (isinstance(session, dict) and 
-                    session.get('session_type') in ['focused_study', 'review'] and
+                if (session.get('session_type') in ('focused_study', 'review') and
                     i < len(sessions) - 1):  # Not last session
                     
-                    break_session = {
-                        'time': SchedulerUtils._add_minutes_to_time(session.get('time', '09:00'), break_interval),
-                        'activity': 'Break',
-                        'duration': '15 minutes',
-                        'topic': 'Rest',
-                        'session_type': 'break'
-                    }
+                    break_session = _BREAK_TEMPLATE.copy()
+                    break_session['time'] = SchedulerUtils._add_minutes_to_time(
+                        session.get('time', '09:00'), break_interval
+                    )
                     enhanced_sessions.append(break_session)
             
             schedule_with_breaks[day] = enhanced_sessions
@@ -214,12 +305,7 @@ class SchedulerUtils:
     @staticmethod
     def _add_minutes_to_time(time_str: str, minutes: int) -> str:
         """Add minutes to time string."""
-        try:
-            time_obj = datetime.strptime(time_str, '%H:%M')
-            new_time = time_obj + timedelta(minutes=minutes)
-            return new_time.strftime('%H:%M')
-        except:
-            return time_str
+        return _add_minutes_cached(time_str, minutes)
     
     @staticmethod
     def prioritize_by_deadline(
@@ -237,16 +323,17 @@ class SchedulerUtils:
             Sorted list of topics (most urgent first)
         """
         now = datetime.now()
-        
-        def urgency_score(topic):
-            deadline = deadlines.get(topic)
-            if not deadline:
-                return float('inf')  # No deadline = lowest priority
-            
-            days_until = (deadline - now).days
-            return days_until
-        
-        return sorted(topics, key=urgency_score)
+        no_deadline = float('inf')  # No deadline = lowest priority
+
+        # Precompute all day deltas in one pass, then stable-sort the
+        # indices against them (argsort style): the sort itself touches
+        # only floats, with no datetime arithmetic or function calls
+        deltas = [
+            (deadline - now).days if (deadline := deadlines.get(topic)) else no_deadline
+            for topic in topics
+        ]
+        order = sorted(range(len(topics)), key=deltas.__getitem__)
+        return [topics[i] for i in order]
     
     @staticmethod
     def calculate_optimal_session_length(
@@ -263,32 +350,22 @@ class SchedulerUtils:
         Returns:
             Recommended session length in minutes
         """
-        base_length = 60  # Base session length in minutes
-        
-        # Adjust for difficulty
+        # Bucket by difficulty, then look the answer up in the table
+        # precomputed at import time
         if difficulty > 0.7:
-            base_length = 45  # Shorter for difficult topics
+            bucket, base_length = 0, 45  # Shorter for difficult topics
         elif difficulty < 0.3:
-            base_length = 90  # Longer for easier topics
-        
-        # Adjust for time of day
+            bucket, base_length = 2, 90  # Longer for easier topics
+        else:
+            bucket, base_length = 1, 60
+
         try:
             hour = int(time_of_day.split(':')[0])
-            
-            # Morning (6-12): Optimal for difficult tasks
-            if 6 <= hour < 12:
-                base_length = int(base_length * 1.1)
-            
-            # Afternoon (12-18): Good for moderate tasks
-            elif 12 <= hour < 18:
-                base_length = base_length
-            
-            # Evening (18-22): Better for review
-            elif 18 <= hour < 22:
-                base_length = int(base_length * 0.9)
-        except:
-            pass
-        
+        except (ValueError, TypeError, AttributeError):
+            return base_length
+
+        if 0 <= hour < 24:
+            return _SESSION_LEN[bucket][hour]
         return base_length
     
     @staticmethod
@@ -308,19 +385,17 @@ class SchedulerUtils:
         Returns:
             List of time strings
         """
-        slots = []
-        
         try:
-            current = datetime.strptime(start_time, '%H:%M')
-            end = datetime.strptime(end_time, '%H:%M')
-            
-            while current < end:
-                slots.append(current.strftime('%H:%M'))
-                current += timedelta(minutes=slot_duration)
+            # Integer minutes: one range plus one inline divmod format
+            # per slot (no wrap handling needed, HH:MM inputs stay below
+            # 24h), no datetime objects or helper calls in the loop
+            return [
+                f"{m // 60:02d}:{m % 60:02d}"
+                for m in range(_to_min(start_time), _to_min(end_time), slot_duration)
+            ]
         except Exception as e:
             logger.error(f"Error generating time slots: {e}")
-        
-        return slots
+            return []
     
     @staticmethod
     def estimate_study_hours_needed(
@@ -339,14 +414,8 @@ class SchedulerUtils:
         Returns:
             Estimated hours needed
         """
-        base_hours = 10  # Base hours for average topic
-        
-        # Adjust for difficulty
-        difficulty_multiplier = 0.5 + (difficulty * 1.5)
-        
-        # Adjust for current knowledge
-        knowledge_gap = 1.0 - current_knowledge
-        
-        estimated_hours = int(base_hours * difficulty_multiplier * knowledge_gap)
-        
-        return max(1, estimated_hours)  # At least 1 hour
\ No newline at end of file
+        # Quantize both inputs to deciles and read the table built at
+        # import: two index ops, no floating-point work at call time
+        di = min(10, max(0, int(difficulty * 10)))
+        ki = min(10, max(0, int(current_knowledge * 10)))
+        return _HOURS_LUT[di][ki]
\ No newline at end of file